@@ -1,17 +1,45 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import base64
 from io import BytesIO
 import csv
 
-# Verificar se openpyxl está disponível
-try:
-    import openpyxl
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
+from dna_triangulation import (
+    CHROM_ORDER,
+    CHROMOSOME_SIZES,
+    DEFAULT_KIT,
+    EXCEL_AVAILABLE,
+    EXPORT_FORMATS,
+    FIGURE_WIDTH,
+    REGION_PAGE_SIZE,
+    Profiler,
+    RenderCache,
+    SegmentIndex,
+    append_segments,
+    build_chromosome_figure,
+    build_color_map,
+    build_matrix_figure,
+    build_region_figure,
+    chart_cache_key,
+    concat_segments,
+    count_kits,
+    coverage_stats,
+    empty_segments,
+    export_chart,
+    figure_to_png,
+    format_bytes,
+    format_number,
+    genome_coverage,
+    ingest_segments,
+    kit_coverage,
+    load_project,
+    read_kits,
+    save_project,
+    segments_for_display,
+    shared_segment_matrix,
+    triangulate,
+)
 
 # Configuração da página
 st.set_page_config(
@@ -20,26 +48,14 @@ st.set_page_config(
     layout="wide"
 )
 
-# Tamanhos reais dos cromossomos (baseado na tabela fornecida)
-chromosome_sizes = {
-    1: 249154567, 2: 242942878, 3: 197526201, 4: 190685303, 5: 181538259,
-    6: 170814183, 7: 158878256, 8: 145919126, 9: 140928675, 10: 135352153,
-    11: 134803123, 12: 130100796, 13: 115008038, 14: 105916797, 15: 102247864,
-    16: 90103117, 17: 80924707, 18: 77869022, 19: 58864479, 20: 62729431,
-    21: 47560946, 22: 51072161, 'X': 155270560, 'Y': 59373566
-}
-
-# Função para gerar cores distintas para cada pessoa
-def generate_distinct_colors(n):
-    """Gera cores visualmente distintas."""
-    colors = plt.cm.tab20.colors + plt.cm.tab20b.colors
-    if n <= len(colors):
-        return {i: colors[i] for i in range(n)}
-    return {i: np.random.rand(3,) for i in range(n)}
+# Tamanhos dos cromossomos usados nesta sessão (editáveis na aba de configurações e
+# restaurados ao abrir um projeto); definidos antes das abas que desenham e calculam
+if "custom_chrom_sizes" not in st.session_state:
+    st.session_state.custom_chrom_sizes = dict(CHROMOSOME_SIZES)
+chromosome_sizes = st.session_state.custom_chrom_sizes
 
-# Função para formatar números grandes com separadores
-def format_number(num):
-    return f"{num:,}".replace(",", ".")
+# Tempos das etapas desta execução do script (painel de diagnóstico)
+profiler = Profiler(label="rerun")
 
 # Função para converter DataFrame para CSV
 def convert_df_to_csv(df):
@@ -57,23 +73,123 @@ def convert_df_to_excel(df):
     processed_data = output.getvalue()
     return processed_data
 
-# Função para formatar ticks do eixo x
-def format_x_ticks(x, pos):
-    """Formata os números do eixo X com separadores de milhar"""
-    return format_number(int(x))
+# Cache de renderização compartilhado entre sessões (chaves dependem só do conteúdo)
+@st.cache_resource
+def get_render_cache():
+    return RenderCache()
+
+# Função para substituir os segmentos da sessão e invalidar o índice
+def set_segments(segments):
+    st.session_state.segments = segments
+    st.session_state.segments_version = st.session_state.get("segments_version", 0) + 1
+
+# Função para obter o índice de segmentos, reconstruído só quando os dados mudam
+def get_segment_index():
+    version = st.session_state.get("segments_version", 0)
+    if st.session_state.get("segment_index_version") != version:
+        with profiler.span("index_build", segments=len(st.session_state.segments)):
+            st.session_state.segment_index = SegmentIndex(st.session_state.segments)
+        st.session_state.segment_index_version = version
+    return st.session_state.segment_index
+
+# Função para aplicar uma edição aos segmentos e ao índice sem reconstruí-lo
+def edit_segments(segments, added=None, removed=None):
+    """Grava `segments` e atualiza no índice apenas os grupos de `added`/`removed`."""
+    segment_index = get_segment_index()
+    if segment_index.qualified != (count_kits(segments) > 1):
+        # O número de kits passou de um para vários (ou o contrário): os rótulos
+        # das pessoas mudam, então o índice é refeito por inteiro
+        set_segments(segments)
+        return
+    with profiler.span("index_update"):
+        if removed is not None:
+            segment_index.remove(removed)
+        if added is not None:
+            segment_index.add(added)
+    set_segments(segments)
+    st.session_state.segment_index_version = st.session_state.segments_version
+
+# Função para acrescentar segmentos à sessão
+def add_segments(new_segments):
+    if new_segments.empty:
+        return
+    with profiler.span("segments_append", segments=len(new_segments)):
+        segments = append_segments(st.session_state.segments, new_segments)
+    edit_segments(segments, added=new_segments)
+
+# Função para remover linhas (posições) dos segmentos da sessão
+def remove_segment_rows(rows):
+    segments = st.session_state.segments
+    edit_segments(segments.drop(index=segments.index[rows]).reset_index(drop=True),
+                  removed=segments.iloc[rows])
+
+# Função para explorar uma região de um cromossomo em resolução total
+@st.fragment
+def region_browser(segment_index, chrom_people, color_map, chrom_sizes, chart_key):
+    """Consulta e redesenha só a janela escolhida; a interação reexecuta apenas este trecho."""
+    st.subheader("🔍 Explorar Região")
+    region_col1, region_col2 = st.columns([1, 3])
+    with region_col1:
+        region_chrom = st.selectbox("Cromossomo da região:", options=list(chrom_people),
+                                    key="region_chrom")
+    with region_col2:
+        region_size = int(chrom_sizes[region_chrom])
+        region_start, region_end = st.slider(
+            "Intervalo (pb):",
+            min_value=0,
+            max_value=region_size,
+            value=(0, min(region_size, 10_000_000)),
+            step=10_000,
+            key=f"region_window_{region_chrom}"
+        )
+    
+    if region_end > region_start:
+        # Apenas os segmentos que cruzam a janela são consultados e desenhados
+        visible_people = list(segment_index.overlapping(region_chrom, region_start, region_end,
+                                                        chrom_people[region_chrom]))
+        # Pessoas em páginas de tamanho fixo: o custo do desenho não cresce com o número de pessoas
+        n_pages = max(1, -(-len(visible_people) // REGION_PAGE_SIZE))
+        page = 1
+        if n_pages > 1:
+            page = st.number_input(f"Página de pessoas (de {n_pages}):", min_value=1, max_value=n_pages,
+                                   value=1, step=1, key=f"region_page_{region_chrom}")
+        region_people = visible_people[(page - 1) * REGION_PAGE_SIZE:page * REGION_PAGE_SIZE]
+        
+        def render_region(index=segment_index, chrom=region_chrom, start=region_start,
+                          end=region_end, people=region_people, colors=color_map):
+            fig, _ = build_region_figure(index, chrom, start, end, people, colors)
+            return figure_to_png(fig, 80, tight=False, compress_level=1)
+        
+        with profiler.span("region_render", people=len(region_people)):
+            region_png = get_render_cache().get_or_render(
+                f"{chart_key}:region:{region_chrom}:{region_start}:{region_end}:{page}", render_region
+            )
+        st.image(region_png, width="stretch")
+        st.caption(
+            f"Cromossomo {region_chrom}: {format_number(region_start)} a "
+            f"{format_number(region_end)} pb ({format_number(region_end - region_start)} pb) — "
+            f"{len(visible_people)} pessoa(s) com segmentos na região"
+        )
+    else:
+        st.warning("Selecione um intervalo com início menor que o fim.")
 
 # Configuração inicial do Streamlit
 st.title("🔬 Visualizador de Mapa Cromossômico - Comparação de Múltiplos DNAs")
 
 # Usar tabs para organizar a interface
-tab1, tab2, tab3 = st.tabs(["📝 Entrada de Dados", "📊 Visualização", "⚙️ Configurações"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 Entrada de Dados", "📊 Visualização", "🔺 Triangulação",
+                                        "🧮 Matriz de Compartilhamento", "⚙️ Configurações"])
 
 with tab1:
     st.write("Insira manualmente as comparações de DNA para visualizar as coincidências cromossômicas.")
     
     # Inicializar session state para armazenar dados
-    if "comparisons" not in st.session_state:
-        st.session_state.comparisons = []
+    if "segments" not in st.session_state:
+        st.session_state.segments = empty_segments()
+    if "imported_files" not in st.session_state:
+        st.session_state.imported_files = set()
+    if "failed_files" not in st.session_state:
+        st.session_state.failed_files = {}
     
     # Opção de upload de CSV
     st.subheader("Importar dados de arquivo")
@@ -84,36 +200,75 @@ with tab1:
         file_types.append("xlsx")
     
     file_type_str = ", ".join(file_types).upper()
-    uploaded_file = st.file_uploader(f"Carregar {file_type_str} com dados", type=file_types)
+    uploaded_files = st.file_uploader(
+        f"Carregar {file_type_str} com dados (cada arquivo vira um kit)",
+        type=file_types,
+        accept_multiple_files=True
+    )
+    
+    # Arquivos que falharam não são lidos de novo; o erro guardado é mostrado enquanto estiverem no uploader
+    for uploaded_file in uploaded_files:
+        if uploaded_file.file_id in st.session_state.failed_files:
+            st.error(st.session_state.failed_files[uploaded_file.file_id])
+    
+    # Importar cada arquivo apenas uma vez (o uploader mantém os arquivos entre reruns)
+    new_files = [file for file in uploaded_files
+                 if file.file_id not in st.session_state.imported_files
+                 and file.file_id not in st.session_state.failed_files]
+    if new_files:
+        # Cada arquivo vira um kit com o nome do arquivo; nomes repetidos ganham um número
+        used_kits = set(st.session_state.segments["Kit"].cat.categories)
+        sources = []
+        kit_files = {}
+        for uploaded_file in new_files:
+            base_name = uploaded_file.name.rsplit(".", 1)[0]
+            kit, suffix = base_name, 2
+            while kit in used_kits:
+                kit, suffix = f"{base_name} ({suffix})", suffix + 1
+            used_kits.add(kit)
+            kit_files[kit] = uploaded_file.file_id
+            sources.append((uploaded_file, uploaded_file.name, kit))
+        
+        # Ler e validar os arquivos em paralelo, guardando apenas os segmentos tipados
+        progress_bar = st.progress(0.0, text="Importando arquivos...")
+        
+        # O progresso por bloco vem das threads de leitura, mas a barra só é atualizada aqui
+        def update_progress(fraction):
+            progress_bar.progress(fraction, text=f"Importando arquivos... {fraction:.0%}")
+        
+        imported_parts = []
+        with profiler.span("upload_parse", files=len(sources)):
+            for kit, future in read_kits(sources, on_progress=update_progress):
+                try:
+                    new_segments, import_errors = future.result()
+                    imported_parts.append(new_segments)
+                    st.session_state.imported_files.add(kit_files[kit])
+                    st.success(f"Kit '{kit}': importados {len(new_segments)} registros com sucesso!")
+                    if not import_errors.empty:
+                        st.warning(f"Kit '{kit}': {len(import_errors)} linhas foram rejeitadas por conter dados inválidos.")
+                        st.dataframe(import_errors, use_container_width=True)
+                except ValueError as e:
+                    st.session_state.failed_files[kit_files[kit]] = f"Kit '{kit}': {e}"
+                    st.error(st.session_state.failed_files[kit_files[kit]])
+                except Exception as e:
+                    st.session_state.failed_files[kit_files[kit]] = f"Erro ao importar o kit '{kit}': {e}"
+                    st.error(st.session_state.failed_files[kit_files[kit]])
+        progress_bar.empty()
+        add_segments(concat_segments(imported_parts))
     
-    if uploaded_file is not None:
+    # Abrir um projeto salvo anteriormente (substitui os dados atuais)
+    project_file = st.file_uploader("Abrir projeto salvo (.dnatri)", type=["dnatri"])
+    if project_file is not None and project_file.file_id not in st.session_state.imported_files:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                import_df = pd.read_csv(uploaded_file)
-            elif EXCEL_AVAILABLE and uploaded_file.name.endswith('.xlsx'):
-                import_df = pd.read_excel(uploaded_file)
-            else:
-                st.error(f"Formato de arquivo não suportado. Use {file_type_str}.")
-                import_df = None
-            
-            # Verificar se as colunas necessárias existem
-            if import_df is not None:
-                required_cols = ["Chr", "Start", "End", "Comparison"]
-                if all(col in import_df.columns for col in required_cols):
-                    # Converter para o formato correto
-                    for _, row in import_df.iterrows():
-                        new_entry = {
-                            "Chr": row["Chr"],
-                            "Start": int(row["Start"]),
-                            "End": int(row["End"]),
-                            "Comparison": row["Comparison"]
-                        }
-                        st.session_state.comparisons.append(new_entry)
-                    st.success(f"Importados {len(import_df)} registros com sucesso!")
-                else:
-                    st.error(f"Formato de arquivo inválido. As colunas devem ser: {', '.join(required_cols)}")
-        except Exception as e:
-            st.error(f"Erro ao importar arquivo: {e}")
+            with profiler.span("project_load", file=project_file.name):
+                project_segments, project_sizes = load_project(project_file)
+            set_segments(project_segments)
+            st.session_state.custom_chrom_sizes = project_sizes
+            chromosome_sizes = project_sizes
+            st.session_state.imported_files.add(project_file.file_id)
+            st.success(f"Projeto aberto com {len(project_segments)} segmentos!")
+        except ValueError as e:
+            st.error(str(e))
     
     # Interface para entrada manual de dados
     st.subheader("Adicionar dados manualmente")
@@ -123,6 +278,8 @@ with tab1:
     with col1:
         with st.form("dna_input_form"):
             person = st.text_input("Nome da Pessoa Comparada:")
+            session_kits = list(st.session_state.segments["Kit"].cat.categories)
+            kit_name = st.text_input("Kit:", value=session_kits[0] if session_kits else DEFAULT_KIT)
             chrom_options = list(range(1, 23)) + ['X', 'Y']
             chrom = st.selectbox("Cromossomo:", chrom_options)
             
@@ -132,60 +289,75 @@ with tab1:
             submit_button = st.form_submit_button("Adicionar Segmento")
             
             if submit_button:
-                try:
-                    # Remover pontuação e converter para inteiro
-                    start_int = int(start.replace(".", "").replace(",", ""))
-                    end_int = int(end.replace(".", "").replace(",", ""))
-                    
-                    if end_int > start_int and chrom in chromosome_sizes:
-                        st.session_state.comparisons.append({
-                            "Chr": chrom, 
-                            "Start": start_int, 
-                            "End": end_int, 
-                            "Comparison": person
-                        })
-                        st.success("Segmento adicionado com sucesso!")
-                    else:
-                        st.error("Erro: O End Position deve ser maior que o Start Position e o cromossomo deve ser válido.")
-                except ValueError:
-                    st.error("Erro: Certifique-se de que os valores de Start e End estão corretos e contêm apenas números e pontos ou vírgulas.")
+                # Posições em texto: a mesma validação dos arquivos importados
+                new_segment, segment_errors = ingest_segments(pd.DataFrame([{
+                    "Chr": chrom, 
+                    "Start": start, 
+                    "End": end, 
+                    "Comparison": person
+                }]), kit_name.strip() or DEFAULT_KIT)
+                if new_segment.empty:
+                    st.error(f"Erro: {segment_errors['Erro'].iloc[0]}")
+                else:
+                    add_segments(new_segment)
+                    st.success("Segmento adicionado com sucesso!")
     
     with col2:
         # Mostrar dados inseridos
-        if st.session_state.comparisons:
-            df = pd.DataFrame(st.session_state.comparisons)
-            st.dataframe(df, use_container_width=True)
+        if not st.session_state.segments.empty:
+            df = st.session_state.segments
+            with profiler.span("segments_display"):
+                display_segments = segments_for_display(df)
+            table_event = st.dataframe(
+                display_segments,
+                use_container_width=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                key="segments_table"
+            )
+            
+            # Botão para remover as linhas selecionadas na tabela
+            selected_rows = table_event.selection.rows
+            if selected_rows and st.button(f"Remover {len(selected_rows)} segmento(s) selecionado(s)"):
+                remove_segment_rows(sorted(selected_rows))
+                st.rerun()
             
             # Botão para limpar dados
             if st.button("Limpar todos os dados"):
-                st.session_state.comparisons = []
-                st.experimental_rerun()
+                set_segments(empty_segments())
+                st.rerun()
             
-            # Botão para exportar dados como CSV
-            csv_data = convert_df_to_csv(df)
+            # Botão para exportar dados como CSV (gerado apenas no clique)
             st.download_button(
                 label="Baixar como CSV",
-                data=csv_data,
+                data=lambda data=df: convert_df_to_csv(data),
                 file_name='chromosome_data.csv',
                 mime='text/csv',
             )
             
             # Botão para exportar dados como Excel (apenas se disponível)
             if EXCEL_AVAILABLE:
-                excel_data = convert_df_to_excel(df)
                 st.download_button(
                     label="Baixar como Excel",
-                    data=excel_data,
+                    data=lambda data=df: convert_df_to_excel(data),
                     file_name='chromosome_data.xlsx',
                     mime='application/vnd.ms-excel',
                 )
+            
+            # Botão para salvar o projeto em formato binário compacto
+            st.download_button(
+                label="Salvar projeto (.dnatri)",
+                data=lambda data=df, sizes=dict(chromosome_sizes): save_project(data, sizes),
+                file_name='chromosome_project.dnatri',
+                mime='application/octet-stream',
+            )
         else:
             st.info("Nenhum dado inserido ainda. Adicione segmentos usando o formulário.")
 
 with tab2:
     # Visualização dos dados
-    if "comparisons" in st.session_state and st.session_state.comparisons:
-        df = pd.DataFrame(st.session_state.comparisons)
+    if not st.session_state.segments.empty:
+        segment_index = get_segment_index()
         
         # Configurações de visualização
         st.subheader("Configurações do Gráfico")
@@ -193,7 +365,7 @@ with tab2:
         col_viz1, col_viz2 = st.columns(2)
         with col_viz1:
             # Opção para filtrar cromossomos
-            all_chroms = sorted(list(set(df["Chr"])), key=lambda x: (isinstance(x, str), x))
+            all_chroms = segment_index.chromosomes()
             selected_chroms = st.multiselect(
                 "Selecionar Cromossomos para Visualizar:",
                 options=all_chroms,
@@ -201,151 +373,84 @@ with tab2:
             )
         
         with col_viz2:
-            # Opção para filtrar pessoas
-            all_people = sorted(df["Comparison"].unique())
+            # Opção para filtrar kits (apenas quando há mais de um arquivo/kit na sessão)
+            all_kits = segment_index.kits()
+            selected_kits = all_kits
+            if len(all_kits) > 1:
+                selected_kits = st.multiselect(
+                    "Selecionar Kits para Visualizar:",
+                    options=all_kits,
+                    default=all_kits
+                )
+            
+            # Opção para filtrar pessoas dos kits escolhidos
+            all_people = [p for p in segment_index.comparisons() if segment_index.kit_of(p) in selected_kits]
             selected_people = st.multiselect(
                 "Selecionar Pessoas para Visualizar:",
                 options=all_people,
                 default=all_people
             )
         
-        # Filtrar dados
-        filtered_df = df[
-            (df["Chr"].isin(selected_chroms)) & 
-            (df["Comparison"].isin(selected_people))
-        ]
+        # Filtrar dados pelo índice: pessoas selecionadas presentes em cada cromossomo
+        with profiler.span("filter"):
+            chrom_people = segment_index.people_by_chromosome(selected_chroms, selected_people)
         
-        if not filtered_df.empty:
-            unique_chromosomes = sorted(filtered_df["Chr"].unique(), key=lambda x: (isinstance(x, str), x))
+        if chrom_people:
+            unique_chromosomes = list(chrom_people)
             
             # Criar mapa de cores para cada comparação
-            unique_comparisons = filtered_df["Comparison"].unique()
-            color_idx = {comp: idx for idx, comp in enumerate(unique_comparisons)}
-            color_palette = generate_distinct_colors(len(unique_comparisons))
-            color_map = {comp: color_palette[color_idx[comp]] for comp in unique_comparisons}
-            
-            # Analisar o número de pessoas por cromossomo para calcular a altura necessária
-            chrom_person_counts = {}
-            for chrom in unique_chromosomes:
-                chrom_data = filtered_df[filtered_df["Chr"] == chrom]
-                chrom_person_counts[chrom] = len(chrom_data["Comparison"].unique())
-            
-            # Definir parâmetros base
-            base_chrom_height = 0.6  # Altura base para o cromossomo
-            person_height = 0.25     # Altura de cada segmento de pessoa
-            person_spacing = 0.15    # Espaçamento entre segmentos de pessoas
-            chrom_spacing = 0.8      # Espaçamento adicional entre cromossomos
-            
-            # Calcular altura para cada cromossomo com base no número de pessoas
-            chrom_heights = {}
-            for chrom, person_count in chrom_person_counts.items():
-                required_height = base_chrom_height + (person_count * (person_height + person_spacing))
-                chrom_heights[chrom] = max(1.2, required_height)  # Garantir altura mínima
-            
-            # Calcular posições Y acumulativas para cada cromossomo
-            y_positions = {}
-            y_cumulative = 0
-            
-            # Ordenar cromossomos primeiro
-            sorted_chroms = sorted(unique_chromosomes, key=lambda x: (isinstance(x, str), x))
-            
-            for chrom in sorted_chroms:
-                y_positions[chrom] = y_cumulative
-                y_cumulative += chrom_heights[chrom] + chrom_spacing
-            
-            # Ajustar tamanho da figura com base na altura total necessária
-            total_height = y_cumulative
-            fig_height = max(6, total_height * 0.8)  # Proporcional à altura total
-            fig, ax = plt.subplots(figsize=(12, fig_height))
-            
-            # Desenhar barras de cromossomos
-            for chrom in unique_chromosomes:
-                chrom_length = chromosome_sizes[chrom]
-                chrom_data = filtered_df[filtered_df["Chr"] == chrom]
-                
-                # Posição base do cromossomo
-                y_base = y_positions[chrom]
-                
-                # Obter o número de pessoas para este cromossomo
-                person_count = chrom_person_counts[chrom]
-                
-                # Calcular a altura total necessária para este cromossomo
-                # baseado no número de pessoas e no espaçamento
-                total_person_height = person_count * (person_height + person_spacing)
-                
-                # Ajustar a altura do fundo do cromossomo para cobrir todos os segmentos
-                # Garantir que cobre exatamente o número de pessoas
-                bg_height = total_person_height
-                
-                # Ajustar o Y inicial para alinhar com o primeiro segmento
-                bg_y_start = y_base
-                
-                # Desenhar barra de fundo do cromossomo com altura adaptada
-                ax.add_patch(plt.Rectangle((0, bg_y_start), chrom_length, bg_height, 
-                                          color='lightgrey', alpha=0.3))
-                
-                # Agrupar segmentos por pessoa
-                person_groups = chrom_data.groupby("Comparison")
-                
-                # Adicionar segmentos para cada pessoa
-                for i, (person, person_data) in enumerate(person_groups):
-                    # Calcular posição Y para esta pessoa dentro do cromossomo
-                    # Começar do topo do cromossomo e ir descendo uniformemente
-                    y_offset = bg_y_start + (i * (person_height + person_spacing))
-                    
-                    # Cor para esta pessoa
-                    color = color_map[person]
-                    
-                    # Adicionar segmentos para esta pessoa
-                    for _, row in person_data.iterrows():
-                        segment_length = row["End"] - row["Start"]
-                        ax.add_patch(plt.Rectangle(
-                            (row["Start"], y_offset), 
-                            segment_length, person_height, 
-                            color=color, alpha=0.8
-                        ))
-                    
-                    # Adicionar o nome da pessoa após o cromossomo inteiro
-                    text_x = chrom_length * 1.02  # Posicionar após o final do cromossomo
-                    text_y = y_offset + (person_height / 2)  # Centralizar verticalmente
-                    ax.text(text_x, text_y, person, fontsize=8, 
-                           va='center', ha='left', color=color)
-            
-            # Configurar eixos
-            # Definir limites do eixo X baseados no maior cromossomo sendo exibido
-            max_chrom_size = max(chromosome_sizes[chrom] for chrom in unique_chromosomes)
-            ax.set_xlim(0, max_chrom_size * 1.25)  # 25% de margem para acomodar os nomes
-            
-            # Ajustar limites do eixo Y para acomodar todos os cromossomos
-            ax.set_ylim(-0.5, total_height)
-            
-            # Posicionar rótulos do eixo Y no centro de cada cromossomo
-            ax.set_yticks([y_positions[chrom] + (chrom_heights[chrom] / 2) for chrom in unique_chromosomes])
-            ax.set_yticklabels([f"Chr {chrom}" for chrom in unique_chromosomes])
-            
-            # Melhorar formatação do eixo X com números formatados
-            from matplotlib.ticker import FuncFormatter
-            ax.xaxis.set_major_formatter(FuncFormatter(format_x_ticks))
-            
-            # Adicionar título e rótulos
-            ax.set_xlabel("Posição no Cromossomo (pb)")
-            ax.set_title("Comparação de Múltiplos DNAs por Cromossomo")
-            ax.grid(axis='x', linestyle='--', alpha=0.3)
-            
-            # Salvar plot
-            st.pyplot(fig)
-            
-            # Botão para baixar a imagem
-            buffer = BytesIO()
-            fig.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
-            buffer.seek(0)
-            img_bytes = buffer.getvalue()
+            unique_comparisons = sorted({p for people in chrom_people.values() for p in people})
+            color_map = build_color_map(unique_comparisons)
+            
+            # Nível de detalhe: une segmentos que cairiam no mesmo pixel da imagem
+            use_lod = st.checkbox(
+                "Desenho simplificado na resolução da imagem (mais rápido)",
+                value=True,
+                help="Segmentos separados por menos de um pixel são desenhados como uma única faixa."
+            )
             
+            # Montar o gráfico apenas se este conteúdo ainda não foi renderizado
+            render_cache = get_render_cache()
+            with profiler.span("chart_key"):
+                chart_key = chart_cache_key(segment_index, chrom_people, color_map, chromosome_sizes)
+            chart_key += ":lod" if use_lod else ":full"
+            
+            def render_chart(dpi, index=segment_index, people=chrom_people, colors=color_map,
+                             sizes=chromosome_sizes, lod=use_lod):
+                with profiler.span("figure_build", dpi=dpi):
+                    fig = build_chromosome_figure(index, people, colors, sizes,
+                                                  pixel_width=FIGURE_WIDTH * dpi if lod else None)
+                with profiler.span("png_encode", dpi=dpi):
+                    return figure_to_png(fig, dpi)
+            
+            # Exibir plot
+            chart_png = render_cache.get_or_render(f"{chart_key}:200", lambda: render_chart(200))
+            st.image(chart_png, width="stretch")
+            
+            # Formato de exportação: PNG, vetorial (SVG/PDF) ou PDF paginado por cromossomo
+            export_labels = {
+                "png": "PNG (300 dpi)",
+                "svg": "SVG (vetorial)",
+                "pdf": "PDF (vetorial)",
+                "pdf-pages": "PDF com uma página por cromossomo",
+            }
+            export_format = st.radio("Formato da imagem:", list(export_labels),
+                                     format_func=export_labels.get, horizontal=True)
+            export_mime, export_extension = EXPORT_FORMATS[export_format]
+            
+            def render_export(fmt=export_format, index=segment_index, people=chrom_people, colors=color_map,
+                              sizes=chromosome_sizes, lod=use_lod):
+                with profiler.span("chart_export", format=fmt):
+                    return export_chart(index, people, colors, sizes, fmt, dpi=300, lod=lod)
+            
+            # Botão para baixar a imagem: o arquivo só é gerado no clique
             st.download_button(
                 label="Baixar Imagem do Gráfico",
-                data=img_bytes,
-                file_name="chromosome_map.png",
-                mime="image/png"
+                data=lambda key=f"{chart_key}:300:{export_format}", render=render_export: (
+                    render_cache.get_or_render(key, render)
+                ),
+                file_name=f"chromosome_map.{export_extension}",
+                mime=export_mime
             )
             
             # Exibir legenda
@@ -362,12 +467,19 @@ with tab2:
                 """
                 legend_cols[col_idx].markdown(legend_html, unsafe_allow_html=True)
             
+            # Explorar uma região de um cromossomo em resolução total
+            region_browser(segment_index, chrom_people, color_map, chromosome_sizes, chart_key)
+            
+            # Agrupar por pessoa e cromossomo a partir do índice, unindo sobreposições
+            with profiler.span("stats"):
+                person_stats = coverage_stats(segment_index, unique_chromosomes, selected_people, chromosome_sizes)
+            
             # Estatísticas
             st.subheader("📊 Estatísticas")
             
             stat_col1, stat_col2, stat_col3 = st.columns(3)
             with stat_col1:
-                st.metric("Total de segmentos", len(filtered_df))
+                st.metric("Total de segmentos", int(person_stats["Total_Segments"].sum()))
             with stat_col2:
                 st.metric("Cromossomos exibidos", len(unique_chromosomes))
             with stat_col3:
@@ -376,47 +488,222 @@ with tab2:
             # Tabela detalhada por pessoa e cromossomo
             st.subheader("Detalhes por Pessoa e Cromossomo")
             
-            # Adicionar colunas de tamanho e porcentagem
-            analysis_df = filtered_df.copy()
-            analysis_df["Segment_Size"] = analysis_df["End"] - analysis_df["Start"]
-            
-            # Agrupar por pessoa e cromossomo
-            person_stats = analysis_df.groupby(["Comparison", "Chr"]).agg(
-                Total_Segments=pd.NamedAgg(column="Chr", aggfunc="count"),
-                Total_Size=pd.NamedAgg(column="Segment_Size", aggfunc="sum")
-            ).reset_index()
-            
-            # Adicionar porcentagem do cromossomo
-            person_stats["Chromosome_Size"] = person_stats["Chr"].map(chromosome_sizes)
-            person_stats["Coverage_Percentage"] = (person_stats["Total_Size"] / person_stats["Chromosome_Size"] * 100).round(2)
-            
             # Formatar os números
-            person_stats["Formatted_Size"] = person_stats["Total_Size"].apply(format_number)
-            person_stats["Formatted_Chr_Size"] = person_stats["Chromosome_Size"].apply(format_number)
+            size_columns = ["Total_Size", "Covered_Size", "Largest_Segment", "Gap_Size", "Largest_Gap"]
+            display_df = person_stats[["Comparison", "Chr", "Total_Segments"] + size_columns[:2]
+                                      + ["Coverage_Percentage"] + size_columns[2:3] + ["Gap_Count"]
+                                      + size_columns[3:]].copy()
+            display_df["Chr"] = display_df["Chr"].astype(str)
+            for column in size_columns:
+                display_df[column] = display_df[column].apply(format_number)
             
             # Exibir tabela final
-            display_df = person_stats[["Comparison", "Chr", "Total_Segments", "Formatted_Size", "Coverage_Percentage"]]
-            display_df.columns = ["Pessoa", "Cromossomo", "Nº Segmentos", "Tamanho Total (pb)", "Cobertura (%)"]
+            display_df.columns = ["Pessoa", "Cromossomo", "Nº Segmentos", "Soma dos Segmentos (pb)",
+                                  "Tamanho Coberto (pb)", "Cobertura (%)", "Maior Segmento (pb)",
+                                  "Nº Lacunas", "Total em Lacunas (pb)", "Maior Lacuna (pb)"]
             
             st.dataframe(display_df, use_container_width=True)
+            
+            # Totais no genoma por pessoa e união de todas as pessoas
+            st.subheader("Totais no Genoma")
+            with profiler.span("genome_totals"):
+                genome_totals = genome_coverage(segment_index, unique_chromosomes, selected_people,
+                                                chromosome_sizes, person_stats)
+            genome_display = genome_totals[["Comparison", "Chromosomes", "Total_Segments",
+                                            "Covered_Size", "Coverage_Percentage"]].copy()
+            genome_display["Covered_Size"] = genome_display["Covered_Size"].apply(format_number)
+            genome_display.columns = ["Pessoa", "Cromossomos", "Nº Segmentos", "Tamanho Coberto (pb)",
+                                      "Cobertura dos Cromossomos Exibidos (%)"]
+            st.dataframe(genome_display, use_container_width=True)
+            
+            # Comparação entre kits: união das pessoas de cada kit
+            if len(selected_kits) > 1:
+                st.subheader("Comparação entre Kits")
+                with profiler.span("kit_totals"):
+                    kit_totals = kit_coverage(segment_index, unique_chromosomes, selected_people, chromosome_sizes)
+                kit_display = kit_totals[["Kit", "People", "Chromosomes", "Total_Segments",
+                                          "Covered_Size", "Coverage_Percentage"]].copy()
+                kit_display["Covered_Size"] = kit_display["Covered_Size"].apply(format_number)
+                kit_display.columns = ["Kit", "Pessoas", "Cromossomos", "Nº Segmentos", "Tamanho Coberto (pb)",
+                                       "Cobertura dos Cromossomos Exibidos (%)"]
+                st.dataframe(kit_display, use_container_width=True)
         else:
             st.warning("Nenhum dado disponível após a aplicação dos filtros.")
     else:
         st.info("Nenhum dado disponível para visualização. Por favor, insira dados na aba 'Entrada de Dados'.")
 
 with tab3:
+    st.subheader("🔺 Triangulação de Segmentos")
+    
+    if not st.session_state.segments.empty:
+        segment_index = get_segment_index()
+        # Chaves por versão dos dados: a seleção volta a incluir tudo quando os segmentos mudam
+        data_version = st.session_state.get("segments_version", 0)
+        st.write("Regiões do genoma onde duas ou mais pessoas compartilham segmentos sobrepostos.")
+        
+        col_tri1, col_tri2 = st.columns(2)
+        with col_tri1:
+            tri_chroms = st.multiselect(
+                "Cromossomos:",
+                options=segment_index.chromosomes(),
+                default=segment_index.chromosomes(),
+                key=f"tri_chroms_{data_version}"
+            )
+            min_comparisons = st.number_input(
+                "Número mínimo de pessoas na região:",
+                min_value=2,
+                value=2,
+                step=1
+            )
+        with col_tri2:
+            tri_people = st.multiselect(
+                "Pessoas:",
+                options=segment_index.comparisons(),
+                default=segment_index.comparisons(),
+                key=f"tri_people_{data_version}"
+            )
+            min_length = st.number_input(
+                "Tamanho mínimo da região (pb):",
+                min_value=0,
+                value=0,
+                step=100000
+            )
+        
+        # Recalcular as regiões apenas quando os dados ou os filtros mudam
+        regions_key = (data_version, tuple(tri_chroms), tuple(tri_people),
+                       int(min_comparisons), int(min_length))
+        if st.session_state.get("triangulation_key") != regions_key:
+            with profiler.span("triangulation", people=len(tri_people)):
+                regions = triangulate(segment_index, tri_chroms, tri_people, int(min_comparisons), int(min_length))
+                display_regions = regions.assign(
+                    Chr=regions["Chr"].astype(str),
+                    Start=regions["Start"].apply(format_number),
+                    End=regions["End"].apply(format_number),
+                    Length=regions["Length"].apply(format_number),
+                )
+                display_regions.columns = ["Cromossomo", "Início (pb)", "Fim (pb)", "Tamanho (pb)",
+                                           "Nº Pessoas", "Pessoas"]
+            st.session_state.triangulation = (regions, display_regions)
+            st.session_state.triangulation_key = regions_key
+        regions, display_regions = st.session_state.triangulation
+        
+        if not regions.empty:
+            tri_col1, tri_col2, tri_col3 = st.columns(3)
+            with tri_col1:
+                st.metric("Regiões encontradas", len(regions))
+            with tri_col2:
+                st.metric("Maior grupo", int(regions["Num_Comparisons"].max()))
+            with tri_col3:
+                st.metric("Maior região (pb)", format_number(int(regions["Length"].max())))
+            
+            st.dataframe(display_regions, use_container_width=True)
+            
+            st.download_button(
+                label="Baixar regiões como CSV",
+                data=lambda data=regions: convert_df_to_csv(data),
+                file_name="triangulation_regions.csv",
+                mime="text/csv",
+            )
+        else:
+            st.warning("Nenhuma região compartilhada encontrada com os filtros atuais.")
+    else:
+        st.info("Nenhum dado disponível para triangulação. Por favor, insira dados na aba 'Entrada de Dados'.")
+
+with tab4:
+    st.subheader("🧮 Matriz de Compartilhamento")
+    
+    if not st.session_state.segments.empty:
+        segment_index = get_segment_index()
+        # Chaves por versão dos dados: a seleção volta a incluir tudo quando os segmentos mudam
+        data_version = st.session_state.get("segments_version", 0)
+        st.write("Pares de bases e segmentos que cada par de pessoas compartilha ao mesmo tempo com você.")
+        
+        col_mat1, col_mat2 = st.columns(2)
+        with col_mat1:
+            matrix_chroms = st.multiselect(
+                "Cromossomos:",
+                options=segment_index.chromosomes(),
+                default=segment_index.chromosomes(),
+                key=f"matrix_chroms_{data_version}"
+            )
+        with col_mat2:
+            matrix_people = st.multiselect(
+                "Pessoas:",
+                options=segment_index.comparisons(),
+                default=segment_index.comparisons(),
+                key=f"matrix_people_{data_version}"
+            )
+        
+        # Recalcular a matriz apenas quando os dados ou a seleção mudam
+        matrix_key = (data_version, tuple(matrix_chroms), tuple(matrix_people))
+        if st.session_state.get("shared_matrix_key") != matrix_key:
+            with profiler.span("shared_matrix", people=len(matrix_people)):
+                st.session_state.shared_matrix = shared_segment_matrix(segment_index, matrix_chroms, matrix_people)
+            st.session_state.shared_matrix_key = matrix_key
+            st.session_state.shared_matrix_images = {}
+        matrix_names, shared_bp, shared_count = st.session_state.shared_matrix
+        
+        if len(matrix_names) >= 2:
+            matrix_metric = st.radio(
+                "Valor exibido:",
+                ["Pares de bases compartilhados", "Nº de segmentos compartilhados"],
+                horizontal=True
+            )
+            matrix = shared_bp if matrix_metric == "Pares de bases compartilhados" else shared_count
+            
+            # Mapa de calor (a diagonal é a própria cobertura de cada pessoa), guardado na sessão
+            matrix_images = st.session_state.shared_matrix_images
+            if matrix_metric not in matrix_images:
+                with profiler.span("matrix_figure"):
+                    matrix_images[matrix_metric] = figure_to_png(
+                        build_matrix_figure(matrix_names, matrix, matrix_metric), 100
+                    )
+            st.image(matrix_images[matrix_metric], width="stretch")
+            
+            # Lista de pares ordenada pelo compartilhamento
+            pair_a, pair_b = np.triu_indices(len(matrix_names), k=1)
+            pairs = pd.DataFrame({
+                "Comparison_A": np.array(matrix_names, dtype=object)[pair_a],
+                "Comparison_B": np.array(matrix_names, dtype=object)[pair_b],
+                "Shared_Size": shared_bp[pair_a, pair_b],
+                "Shared_Segments": shared_count[pair_a, pair_b],
+            })
+            pairs = pairs[pairs["Shared_Size"] > 0].sort_values("Shared_Size", ascending=False)
+            
+            st.subheader("Pares com maior compartilhamento")
+            pairs_display = pairs.head(100).assign(Shared_Size=lambda df: df["Shared_Size"].apply(format_number))
+            pairs_display.columns = ["Pessoa A", "Pessoa B", "Compartilhado (pb)", "Nº Segmentos"]
+            st.dataframe(pairs_display, use_container_width=True)
+            
+            # Downloads gerados apenas no clique
+            st.download_button(
+                label="Baixar matriz como CSV",
+                data=lambda names=matrix_names, values=matrix: convert_df_to_csv(
+                    pd.DataFrame(values, index=names, columns=names).rename_axis("Comparison").reset_index()
+                ),
+                file_name="shared_matrix.csv",
+                mime="text/csv",
+            )
+            st.download_button(
+                label="Baixar lista de pares como CSV",
+                data=lambda data=pairs: convert_df_to_csv(data),
+                file_name="shared_pairs.csv",
+                mime="text/csv",
+            )
+        else:
+            st.warning("Selecione ao menos duas pessoas com segmentos nos cromossomos escolhidos.")
+    else:
+        st.info("Nenhum dado disponível para a matriz. Por favor, insira dados na aba 'Entrada de Dados'.")
+
+with tab5:
     st.subheader("⚙️ Configurações da Aplicação")
     
     # Opção para editar tamanhos dos cromossomos
     st.write("Editar tamanhos dos cromossomos:")
     
-    # Criar cópia modificável dos tamanhos
-    if "custom_chrom_sizes" not in st.session_state:
-        st.session_state.custom_chrom_sizes = chromosome_sizes.copy()
-    
     # Interface para editar tamanhos
     cols_per_row = 3
-    chrom_list = sorted(list(chromosome_sizes.keys()), key=lambda x: (isinstance(x, str), x))
+    chrom_list = [chrom for chrom in CHROM_ORDER if chrom in chromosome_sizes]
     
     # Criar linhas de colunas
     for i in range(0, len(chrom_list), cols_per_row):
@@ -433,13 +720,45 @@ with tab3:
                     )
                     st.session_state.custom_chrom_sizes[chrom] = new_size
     
-    # Botão para restaurar valores padrão
-    if st.button("Restaurar tamanhos padrão"):
-        st.session_state.custom_chrom_sizes = chromosome_sizes.copy()
+    # Botão para restaurar valores padrão (aplicado antes do próximo rerun, que redesenha tudo)
+    def restore_chrom_sizes():
+        st.session_state.custom_chrom_sizes = dict(CHROMOSOME_SIZES)
+    
+    if st.button("Restaurar tamanhos padrão", on_click=restore_chrom_sizes):
         st.success("Tamanhos dos cromossomos restaurados para os valores padrão!")
     
-    # Aplicar as alterações
-    chromosome_sizes = st.session_state.custom_chrom_sizes
+    # Painel opcional com os tempos das etapas desta execução e a memória da sessão
+    st.write("---")
+    if st.checkbox("Mostrar diagnóstico de desempenho", key="show_diagnostics"):
+        st.subheader("🩺 Diagnóstico de Desempenho")
+        session_memory = {
+            "segments_bytes": int(st.session_state.segments.memory_usage(deep=True).sum()),
+            "segment_index_bytes": st.session_state.segment_index.nbytes
+                                   if "segment_index" in st.session_state else 0,
+            "render_cache_bytes": get_render_cache().nbytes,
+        }
+        
+        mem_col1, mem_col2, mem_col3 = st.columns(3)
+        with mem_col1:
+            st.metric("Segmentos (DataFrame)", format_bytes(session_memory["segments_bytes"]))
+        with mem_col2:
+            st.metric("Índice de segmentos", format_bytes(session_memory["segment_index_bytes"]))
+        with mem_col3:
+            st.metric("Cache de imagens", format_bytes(session_memory["render_cache_bytes"]),
+                      help=f"{len(get_render_cache())} imagens, compartilhado entre sessões")
+        
+        # Tempos por etapa (as abas 1 a 4 já foram executadas neste ponto do script)
+        profile_summary = profiler.summary()
+        profile_summary.columns = ["Etapa", "Chamadas", "Tempo Total (ms)", "Maior Tempo (ms)"]
+        st.dataframe(profile_summary, use_container_width=True)
+        st.caption("Etapas servidas pelo cache não aparecem; imagens de download são geradas só no clique.")
+        
+        st.download_button(
+            label="Baixar medições (JSON)",
+            data=profiler.to_json(session_memory=session_memory),
+            file_name="performance_spans.json",
+            mime="application/json",
+        )
     
     # Informações adicionais
     st.write("---")
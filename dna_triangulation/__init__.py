@@ -0,0 +1,47 @@
+"""Núcleo do visualizador de mapa cromossômico, independente do Streamlit.
+
+Reúne o modelo de segmentos, a leitura de arquivos, as estatísticas, a
+triangulação e o desenho do gráfico, usados tanto pelo aplicativo
+(app.py) quanto pela linha de comando (python -m dna_triangulation).
+"""
+
+from .matrix import shared_segment_matrix
+from .profiling import Profiler, format_bytes
+from .project import load_project, save_project
+from .readers import EXCEL_AVAILABLE, match_columns, read_kits, read_segment_chunks, read_segments
+from .render import (
+    EXPORT_FORMATS,
+    FIGURE_WIDTH,
+    REGION_PAGE_SIZE,
+    RenderCache,
+    build_chromosome_figure,
+    build_color_map,
+    build_matrix_figure,
+    build_region_figure,
+    chart_cache_key,
+    export_chart,
+    figure_to_png,
+    format_number,
+    format_x_ticks,
+    generate_distinct_colors,
+)
+from .segments import (
+    CHROM_ORDER,
+    CHROMOSOME_SIZES,
+    DEFAULT_KIT,
+    KIT_SEPARATOR,
+    POSITION_DTYPE,
+    REQUIRED_COLUMNS,
+    SegmentIndex,
+    append_segments,
+    comparison_labels,
+    concat_segments,
+    count_kits,
+    empty_segments,
+    ingest_segments,
+    merge_intervals,
+    normalize_chrom_label,
+    segments_for_display,
+)
+from .stats import coverage_stats, genome_coverage, kit_coverage, union_coverage
+from .triangulation import triangulate
@@ -0,0 +1,129 @@
+"""Medição de desempenho de cada etapa sobre dados sintéticos.
+
+Uso:
+    python -m dna_triangulation.benchmark [--sizes 1000 100000 1000000] [-o resultado.jsonl]
+
+Para cada tamanho, mede importação (CSV em blocos), índice e filtro,
+estatísticas por pessoa, matriz de compartilhamento, montagem do gráfico
+e exportação PNG. Cada medição é uma linha JSON com o tempo de parede, o
+pico de memória alocada na etapa (tracemalloc) e o RSS máximo do
+processo, para acompanhar regressões entre versões. O tracemalloc deixa as etapas
+mais lentas; use --no-memory para medir apenas os tempos.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from .matrix import shared_segment_matrix
+from .readers import read_segments
+from .render import FIGURE_WIDTH, build_chromosome_figure, build_color_map, figure_to_png
+from .segments import CHROMOSOME_SIZES, SegmentIndex
+from .stats import coverage_stats, genome_coverage
+from .synthetic import synthetic_segments
+
+# Função para medir o tempo e a memória de uma etapa
+def measure(stage, function):
+    """Executa `function` e retorna (resultado, medição da etapa).
+
+    O pico de memória só é registrado quando o tracemalloc está ativo;
+    caso contrário `peak_bytes` fica como None.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start_time = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1] if tracing else None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024  # Linux reporta em KiB
+    return result, {"stage": stage, "seconds": round(seconds, 6), "peak_bytes": peak, "max_rss_bytes": max_rss}
+
+# Função para executar todas as etapas para um tamanho de conjunto
+def run_benchmark(n_segments, n_comparisons=20, dpi=150, seed=0, lod=True):
+    """Mede as etapas do aplicativo sobre `n_segments` segmentos sintéticos."""
+    raw = synthetic_segments(n_segments, n_comparisons, seed=seed)
+    csv_bytes = BytesIO()
+    raw.to_csv(csv_bytes, index=False)
+    del raw
+
+    chrom_sizes = dict(CHROMOSOME_SIZES)
+    records = []
+
+    def ingest():
+        csv_bytes.seek(0)
+        return read_segments(csv_bytes, "synthetic.csv")[0]
+    segments, record = measure("ingest", ingest)
+    records.append(record)
+
+    def index_and_filter():
+        segment_index = SegmentIndex(segments)
+        return segment_index, segment_index.people_by_chromosome()
+    (segment_index, chrom_people), record = measure("filter", index_and_filter)
+    records.append(record)
+
+    chroms = list(chrom_people)
+    people = segment_index.comparisons()
+
+    def statistics():
+        stats = coverage_stats(segment_index, chroms, people, chrom_sizes)
+        return genome_coverage(segment_index, chroms, people, chrom_sizes, stats)
+    _, record = measure("stats", statistics)
+    records.append(record)
+
+    _, record = measure("shared_matrix", lambda: shared_segment_matrix(segment_index, chroms, people))
+    records.append(record)
+
+    color_map = build_color_map(people)
+    fig, record = measure("figure", lambda: build_chromosome_figure(
+        segment_index, chrom_people, color_map, chrom_sizes, pixel_width=FIGURE_WIDTH * dpi if lod else None
+    ))
+    records.append(record)
+
+    _, record = measure("png_export", lambda: figure_to_png(fig, dpi))
+    records.append(record)
+
+    for record in records:
+        record.update({"segments": n_segments, "comparisons": n_comparisons, "dpi": dpi, "lod": lod})
+    return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m dna_triangulation.benchmark",
+        description="Mede o desempenho das etapas do visualizador sobre dados sintéticos.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="quantidades de segmentos a medir (padrão: 1000 100000 1000000)")
+    parser.add_argument("--comparisons", type=int, default=20, help="número de pessoas comparadas (padrão: 20)")
+    parser.add_argument("--dpi", type=int, default=150, help="resolução da exportação PNG (padrão: 150)")
+    parser.add_argument("--full-resolution", action="store_true",
+                        help="desenha todos os segmentos, sem o nível de detalhe por pixel")
+    parser.add_argument("--seed", type=int, default=0, help="semente do gerador sintético")
+    parser.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout,
+                        help="arquivo JSON Lines de saída (padrão: saída padrão)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="não rastreia alocações (tempos mais fiéis, sem peak_bytes)")
+    args = parser.parse_args(argv)
+
+    environment = {"python": platform.python_version(), "machine": platform.machine()}
+    if not args.no_memory:
+        tracemalloc.start()
+    try:
+        for n_segments in args.sizes:
+            for record in run_benchmark(n_segments, args.comparisons, args.dpi, args.seed,
+                                        lod=not args.full_resolution):
+                args.output.write(json.dumps({**record, **environment}) + "\n")
+                args.output.flush()
+    finally:
+        tracemalloc.stop()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
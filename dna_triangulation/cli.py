@@ -0,0 +1,117 @@
+"""Linha de comando para gerar gráficos e estatísticas em lote, sem o Streamlit.
+
+Uso:
+    python -m dna_triangulation PASTA_ENTRADA -o PASTA_SAIDA [-j PROCESSOS] [--format png|svg|pdf|pdf-pages]
+
+Cada arquivo .csv, .xlsx ou .dnatri da pasta de entrada é processado em um
+processo separado e gera, na pasta de saída, o gráfico (PNG, SVG ou PDF), as
+estatísticas por pessoa e cromossomo, os totais no genoma e as regiões
+trianguladas (CSV).
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .project import load_project
+from .readers import read_segments
+from .render import EXPORT_FORMATS, build_color_map, export_chart
+from .segments import CHROMOSOME_SIZES, SegmentIndex
+from .stats import coverage_stats, genome_coverage
+from .triangulation import triangulate
+
+SUPPORTED_SUFFIXES = (".csv", ".xlsx", ".dnatri")
+
+# Função para carregar os segmentos de um arquivo de dados ou de projeto
+def load_segments_file(path):
+    """Retorna (segmentos, erros, tamanhos dos cromossomos) de um arquivo."""
+    if path.suffix.lower() == ".dnatri":
+        segments, chrom_sizes = load_project(path)
+        return segments, None, chrom_sizes
+    with open(path, "rb") as file:
+        segments, errors = read_segments(file, path.name)
+    return segments, errors, dict(CHROMOSOME_SIZES)
+
+# Função para processar um arquivo e gravar o gráfico e as tabelas
+def process_file(path, output_dir, dpi=150, min_comparisons=2, chart_format="png"):
+    """Gera as saídas de um arquivo e retorna um resumo do que foi gravado."""
+    path = Path(path)
+    output_dir = Path(output_dir)
+    segments, errors, chrom_sizes = load_segments_file(path)
+    outputs = []
+
+    if errors is not None and not errors.empty:
+        errors_path = output_dir / f"{path.stem}_errors.csv"
+        errors.to_csv(errors_path, index=False)
+        outputs.append(errors_path.name)
+
+    if not segments.empty:
+        segment_index = SegmentIndex(segments)
+        chroms = segment_index.chromosomes()
+        people = segment_index.comparisons()
+
+        chrom_people = segment_index.people_by_chromosome(chroms, people)
+        chart_path = output_dir / f"{path.stem}_chart.{EXPORT_FORMATS[chart_format][1]}"
+        chart_path.write_bytes(export_chart(segment_index, chrom_people, build_color_map(people), chrom_sizes,
+                                            chart_format, dpi=dpi))
+
+        stats = coverage_stats(segment_index, chroms, people, chrom_sizes)
+        tables = {
+            "stats": stats,
+            "genome": genome_coverage(segment_index, chroms, people, chrom_sizes, stats),
+            "triangulation": triangulate(segment_index, chroms, people, min_comparisons),
+        }
+        outputs.append(chart_path.name)
+        for name, table in tables.items():
+            table_path = output_dir / f"{path.stem}_{name}.csv"
+            table.to_csv(table_path, index=False)
+            outputs.append(table_path.name)
+
+    return {
+        "file": path.name,
+        "segments": len(segments),
+        "rejected": 0 if errors is None else len(errors),
+        "outputs": outputs,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m dna_triangulation",
+        description="Gera gráficos e estatísticas de segmentos de DNA para todos os arquivos de uma pasta.",
+    )
+    parser.add_argument("input_dir", type=Path, help="pasta com arquivos .csv, .xlsx ou .dnatri")
+    parser.add_argument("-o", "--output-dir", type=Path, required=True, help="pasta onde as saídas serão gravadas")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="número de processos em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--dpi", type=int, default=150, help="resolução do PNG do gráfico e do nível de detalhe nos formatos vetoriais (padrão: 150)")
+    parser.add_argument("--format", dest="chart_format", choices=list(EXPORT_FORMATS), default="png",
+                        help="formato do gráfico; pdf-pages gera uma página por cromossomo (padrão: png)")
+    parser.add_argument("--min-comparisons", type=int, default=2,
+                        help="número mínimo de pessoas por região triangulada (padrão: 2)")
+    args = parser.parse_args(argv)
+
+    files = sorted(p for p in args.input_dir.iterdir() if p.suffix.lower() in SUPPORTED_SUFFIXES)
+    if not files:
+        print(f"Nenhum arquivo {', '.join(SUPPORTED_SUFFIXES)} encontrado em {args.input_dir}", file=sys.stderr)
+        return 1
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(process_file, path, args.output_dir, args.dpi, args.min_comparisons, args.chart_format): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"ERRO {path.name}: {e}", file=sys.stderr)
+                continue
+            print(f"{result['file']}: {result['segments']} segmentos, "
+                  f"{result['rejected']} linhas rejeitadas -> {', '.join(result['outputs'])}")
+    return 1 if failures else 0
@@ -0,0 +1,57 @@
+"""Matriz de compartilhamento entre todos os pares de pessoas comparadas."""
+
+import numpy as np
+
+from .triangulation import elementary_membership
+
+# Função para calcular a matriz de pares de bases e segmentos compartilhados
+def shared_segment_matrix(segment_index, chroms, comparisons, chunk_rows=4096):
+    """Matrizes N×N de sobreposição entre as pessoas, somadas sobre `chroms`.
+
+    Retorna (names, shared_bp, shared_count): os nomes em ordem alfabética,
+    os pares de bases cobertos ao mesmo tempo por cada par de pessoas e o
+    número de segmentos compartilhados (trechos contínuos onde as duas
+    estão presentes). Na diagonal ficam a cobertura e o número de blocos
+    de cada pessoa.
+
+    Cada cromossomo é decomposto em intervalos elementares; com a matriz de
+    presença P (intervalos × pessoas) e os tamanhos L dos intervalos, os pares
+    de bases são Pᵀ·diag(L)·P e os segmentos são PᵀP − QᵀQ, onde Q marca a
+    presença contínua com o intervalo anterior. Os produtos são feitos em
+    blocos de `chunk_rows` intervalos, sem laços sobre pares de pessoas.
+    """
+    names = sorted(set(comparisons))
+    codes = {name: code for code, name in enumerate(names)}
+    shared_bp = np.zeros((len(names), len(names)))
+    shared_count = np.zeros((len(names), len(names)))
+
+    for chrom in chroms:
+        people = [person for person in segment_index.comparisons(chrom) if person in codes]
+        if not people:
+            continue
+        # Colunas locais: apenas as pessoas presentes neste cromossomo
+        blocks = [(column, *segment_index.merged(chrom, person)) for column, person in enumerate(people)]
+        bounds, interval, column = elementary_membership(blocks)
+        lengths = np.diff(bounds).astype(np.float64)
+        order = np.argsort(interval, kind="stable")
+        interval, column = interval[order], column[order]
+
+        chrom_bp = np.zeros((len(people), len(people)))
+        chrom_count = np.zeros((len(people), len(people)))
+        previous = np.zeros(len(people))  # presença no último intervalo do bloco anterior
+        n_intervals = len(bounds) - 1
+        for lo in range(0, n_intervals, chunk_rows):
+            hi = min(lo + chunk_rows, n_intervals)
+            first, last = np.searchsorted(interval, [lo, hi])
+            present = np.zeros((hi - lo, len(people)))
+            present[interval[first:last] - lo, column[first:last]] = 1.0
+            continued = present * np.vstack([previous, present[:-1]])
+            chrom_bp += (present * lengths[lo:hi, None]).T @ present
+            chrom_count += present.T @ present - continued.T @ continued
+            previous = present[-1]
+
+        positions = np.array([codes[person] for person in people])
+        shared_bp[np.ix_(positions, positions)] += chrom_bp
+        shared_count[np.ix_(positions, positions)] += chrom_count
+
+    return names, shared_bp.round().astype(np.int64), shared_count.round().astype(np.int64)
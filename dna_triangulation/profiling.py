@@ -0,0 +1,73 @@
+"""Medição de tempo das etapas do aplicativo (spans nomeados)."""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Função para formatar tamanhos em bytes
+def format_bytes(num):
+    for unit in ("B", "KB", "MB"):
+        if num < 1024:
+            return f"{num:.0f} {unit}" if unit == "B" else f"{num:.1f} {unit}"
+        num /= 1024
+    return f"{num:.1f} GB"
+
+# Registro de spans de tempo de uma execução
+class Profiler:
+    """Guarda spans nomeados (início, duração, profundidade) de uma execução.
+
+    Uso: `with profiler.span("stats"): ...`. Spans podem ser aninhados; a
+    profundidade indica o aninhamento e os tempos são relativos à criação
+    do Profiler.
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.created = datetime.now(timezone.utc)
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name, **details):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.spans.append({
+                "name": name,
+                "start_ms": round((start - self._origin) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "depth": self._depth,
+                **details,
+            })
+
+    def ordered_spans(self):
+        """Spans em ordem de início (os internos terminam antes e são gravados antes)."""
+        return sorted(self.spans, key=lambda span: (span["start_ms"], span["depth"]))
+
+    def summary(self):
+        """DataFrame com chamadas, tempo total e maior tempo por nome de span."""
+        if not self.spans:
+            return pd.DataFrame(columns=["Span", "Calls", "Total_ms", "Max_ms"])
+        spans = pd.DataFrame(self.ordered_spans())
+        summary = spans.groupby("name", sort=False).agg(
+            Calls=pd.NamedAgg(column="duration_ms", aggfunc="count"),
+            Total_ms=pd.NamedAgg(column="duration_ms", aggfunc="sum"),
+            Max_ms=pd.NamedAgg(column="duration_ms", aggfunc="max"),
+        ).reset_index().rename(columns={"name": "Span"})
+        return summary.round(3)
+
+    def to_json(self, **extra):
+        """Spans em JSON, com data de criação e campos extras (ex.: memória da sessão)."""
+        return json.dumps({
+            "label": self.label,
+            "created": self.created.isoformat(),
+            **extra,
+            "spans": self.ordered_spans(),
+        }, indent=2, default=str)
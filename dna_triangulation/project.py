@@ -0,0 +1,103 @@
+"""Arquivo de projeto binário (.dnatri) com leitura mapeada em memória."""
+
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .segments import CHROM_ORDER, DEFAULT_KIT, POSITION_DTYPE, normalize_chrom_label
+
+# Formato binário de projeto: cabeçalho JSON seguido de arrays tipados alinhados
+PROJECT_MAGIC = b"DNATRI01"
+PROJECT_ALIGNMENT = 64
+PROJECT_VERSION = 3  # Versão 1: posições em int64; versão 2: sem kits
+PROJECT_ARRAYS = {"chr": "|i1", "comparison": "<i4", "start": "<i4", "end": "<i4", "kit": "<i2"}
+
+# Função para salvar os segmentos e os tamanhos dos cromossomos em um arquivo de projeto
+def save_project(segments, chrom_sizes):
+    """Serializa o projeto em bytes (.dnatri).
+
+    Layout: assinatura, tamanho do cabeçalho (uint64), cabeçalho JSON com a
+    tabela de nomes das pessoas, os tamanhos dos cromossomos e a posição de
+    cada array, e então os arrays brutos alinhados em 64 bytes, prontos para
+    serem mapeados em memória na leitura.
+    """
+    arrays = {
+        "chr": segments["Chr"].cat.codes.to_numpy(),
+        "comparison": segments["Comparison"].cat.codes.to_numpy(),
+        "start": segments["Start"].to_numpy(),
+        "end": segments["End"].to_numpy(),
+        "kit": segments["Kit"].cat.codes.to_numpy(),
+    }
+    arrays = {name: np.ascontiguousarray(arrays[name], dtype=dtype) for name, dtype in PROJECT_ARRAYS.items()}
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": PROJECT_ARRAYS[name], "offset": offset}
+        offset += -(-array.nbytes // PROJECT_ALIGNMENT) * PROJECT_ALIGNMENT
+    header = json.dumps({
+        "version": PROJECT_VERSION,
+        "count": len(segments),
+        "comparisons": [str(name) for name in segments["Comparison"].cat.categories],
+        "kits": [str(name) for name in segments["Kit"].cat.categories],
+        "chromosome_sizes": {str(chrom): int(size) for chrom, size in chrom_sizes.items()},
+        "arrays": layout,
+    }).encode()
+
+    data_start = -(-(len(PROJECT_MAGIC) + 8 + len(header)) // PROJECT_ALIGNMENT) * PROJECT_ALIGNMENT
+    buffer = bytearray(data_start + offset)
+    buffer[:len(PROJECT_MAGIC)] = PROJECT_MAGIC
+    buffer[len(PROJECT_MAGIC):len(PROJECT_MAGIC) + 8] = struct.pack("<Q", len(header))
+    buffer[len(PROJECT_MAGIC) + 8:len(PROJECT_MAGIC) + 8 + len(header)] = header
+    for name, array in arrays.items():
+        position = data_start + layout[name]["offset"]
+        buffer[position:position + array.nbytes] = array.tobytes()
+    return bytes(buffer)
+
+# Função para abrir um arquivo de projeto sem copiar os arrays
+def load_project(source):
+    """Lê um projeto .dnatri e retorna (segmentos, tamanhos dos cromossomos).
+
+    `source` pode ser um caminho, mapeado com np.memmap, ou um buffer em
+    memória (bytes, arquivo enviado), lido com np.frombuffer; em ambos os
+    casos os arrays não são copiados nem convertidos.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        buffer = np.memmap(source, dtype=np.uint8, mode="r").view(np.ndarray)
+    elif hasattr(source, "getbuffer"):
+        buffer = np.frombuffer(source.getbuffer(), dtype=np.uint8)
+    else:
+        buffer = np.frombuffer(source, dtype=np.uint8)
+
+    if bytes(buffer[:len(PROJECT_MAGIC)]) != PROJECT_MAGIC:
+        raise ValueError("Arquivo de projeto inválido.")
+    header_size = struct.unpack("<Q", bytes(buffer[len(PROJECT_MAGIC):len(PROJECT_MAGIC) + 8]))[0]
+    header_end = len(PROJECT_MAGIC) + 8 + header_size
+    header = json.loads(bytes(buffer[len(PROJECT_MAGIC) + 8:header_end]))
+    data_start = -(-header_end // PROJECT_ALIGNMENT) * PROJECT_ALIGNMENT
+
+    count = header["count"]
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        position = data_start + spec["offset"]
+        arrays[name] = buffer[position:position + count * dtype.itemsize].view(dtype)
+
+    segments = pd.DataFrame({
+        "Chr": pd.Categorical.from_codes(arrays["chr"], categories=CHROM_ORDER, ordered=True),
+        # Projetos da versão 1 (int64) são convertidos; os atuais não são copiados
+        "Start": arrays["start"].astype(POSITION_DTYPE, copy=False),
+        "End": arrays["end"].astype(POSITION_DTYPE, copy=False),
+        "Comparison": pd.Categorical.from_codes(arrays["comparison"], categories=header["comparisons"]),
+    }, copy=False)
+    if "kit" in arrays:
+        segments["Kit"] = pd.Categorical.from_codes(arrays["kit"], categories=header["kits"])
+    else:
+        segments["Kit"] = pd.Categorical.from_codes(np.zeros(count, dtype=np.int8), categories=[DEFAULT_KIT])
+    chrom_sizes = {
+        normalize_chrom_label(chrom): size for chrom, size in header["chromosome_sizes"].items()
+    }
+    return segments, chrom_sizes
@@ -0,0 +1,156 @@
+"""Leitura em blocos dos arquivos de segmentos exportados pelas empresas de teste."""
+
+import csv
+import itertools
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from .segments import DEFAULT_KIT, REQUIRED_COLUMNS, concat_segments, ingest_segments
+
+# Verificar se openpyxl está disponível
+try:
+    import openpyxl
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+# Nomes de colunas usados nas exportações das empresas de teste, em ordem de prioridade
+COLUMN_ALIASES = {
+    "Chr": ["chr", "chromosome", "chrom", "chromosome number", "chromosome name"],
+    "Start": ["start", "start location", "start position", "start point", "chromosome start point",
+              "b37 start", "b36 start", "start pos"],
+    "End": ["end", "end location", "end position", "end point", "chromosome end point",
+            "b37 end", "b36 end", "end pos"],
+    "Comparison": ["comparison", "match name", "matchname", "match", "display name", "name"],
+}
+
+# Quantidade de linhas lidas por bloco na importação de arquivos
+SEGMENT_CHUNK_ROWS = 100_000
+
+# Função para mapear os cabeçalhos de um arquivo para as colunas obrigatórias
+def match_columns(columns):
+    """Retorna {coluna original: coluna do aplicativo} para as colunas obrigatórias.
+
+    Levanta ValueError se alguma delas não for encontrada.
+    """
+    normalized = {" ".join(str(col).replace("_", " ").lower().split()): col for col in columns}
+    mapping = {}
+    for target, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized and normalized[alias] not in mapping:
+                mapping[normalized[alias]] = target
+                break
+    if set(mapping.values()) != set(REQUIRED_COLUMNS):
+        raise ValueError(f"Formato de arquivo inválido. As colunas devem ser: {', '.join(REQUIRED_COLUMNS)}")
+    return mapping
+
+# Função para ler um arquivo de segmentos em blocos, sem carregá-lo inteiro na memória
+def read_segment_chunks(file, file_name, chunksize=SEGMENT_CHUNK_ROWS):
+    """Gera tuplas (bloco, progresso) com até `chunksize` linhas por bloco.
+
+    Cada bloco traz só as colunas obrigatórias, já renomeadas, e mantém o
+    índice da linha no arquivo para o relatório de erros. CSV é lido com
+    pd.read_csv(chunksize=...) e XLSX com o modo somente leitura do openpyxl.
+    """
+    file.seek(0, 2)
+    total_size = max(file.tell(), 1)
+    file.seek(0)
+
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == '.csv':
+        # Detectar o separador e as colunas pelo cabeçalho
+        header_line = file.readline().decode("utf-8-sig", errors="replace")
+        file.seek(0)
+        sep = max([",", ";", "\t"], key=header_line.count)
+        header = next(csv.reader([header_line], delimiter=sep))
+        mapping = match_columns(header)
+        reader = pd.read_csv(file, sep=sep, usecols=list(mapping), chunksize=chunksize,
+                             encoding="utf-8-sig")
+        for chunk in reader:
+            yield chunk.rename(columns=mapping), min(file.tell() / total_size, 1.0)
+    elif EXCEL_AVAILABLE and extension == '.xlsx':
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            mapping = match_columns([col for col in header if col is not None])
+            positions = [header.index(col) for col in mapping]
+            total_rows = max((sheet.max_row or 0) - 1, 1)
+            row_offset = 0
+            while True:
+                batch = [[row[i] if i < len(row) else None for i in positions]
+                         for row in itertools.islice(rows, chunksize)]
+                if not batch:
+                    break
+                chunk = pd.DataFrame(batch, columns=[mapping[col] for col in mapping],
+                                     index=pd.RangeIndex(row_offset, row_offset + len(batch)))
+                row_offset += len(batch)
+                yield chunk, min(row_offset / total_rows, 1.0)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {file_name}")
+
+# Função para ler, validar e tipar um arquivo de segmentos inteiro
+def read_segments(file, file_name, chunksize=SEGMENT_CHUNK_ROWS, on_progress=None, kit=DEFAULT_KIT):
+    """Lê o arquivo em blocos e retorna (segmentos, erros), como ingest_segments.
+
+    Apenas os segmentos já tipados de cada bloco ficam em memória.
+    `on_progress(fração lida, segmentos importados)` é chamado após cada bloco.
+    """
+    segment_parts = []
+    error_parts = []
+    imported_rows = 0
+    for raw_chunk, progress in read_segment_chunks(file, file_name, chunksize):
+        chunk_segments, chunk_errors = ingest_segments(raw_chunk, kit)
+        segment_parts.append(chunk_segments)
+        error_parts.append(chunk_errors)
+        imported_rows += len(chunk_segments)
+        if on_progress is not None:
+            on_progress(progress, imported_rows)
+    errors = pd.concat(error_parts, ignore_index=True) if error_parts else pd.DataFrame(columns=["Linha", "Erro"])
+    return concat_segments(segment_parts), errors
+
+# Função para ler vários arquivos ao mesmo tempo, um kit por arquivo
+def read_kits(sources, max_workers=None, on_progress=None, poll_interval=0.2):
+    """Lê vários arquivos em paralelo e gera (kit, future) à medida que terminam.
+
+    `sources` é uma lista de (arquivo, nome do arquivo, kit). Cada leitura
+    roda em uma thread do pool (a leitura do CSV em C libera o GIL) e o
+    resultado de `future.result()` é o par (segmentos, erros) de
+    read_segments, ou a exceção da leitura daquele arquivo.
+
+    Cada thread grava o progresso de seus blocos em um dicionário protegido
+    por lock; `on_progress(fração total lida)` é chamado na thread de quem
+    consome o gerador, a cada `poll_interval` segundos e a cada arquivo
+    concluído, nunca a partir das threads do pool.
+    """
+    progress = {}
+    lock = threading.Lock()
+
+    def read_kit(file, file_name, kit):
+        def report(fraction, _rows):
+            with lock:
+                progress[kit] = fraction
+        return read_segments(file, file_name, on_progress=report, kit=kit)
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1)) as pool:
+        futures = {
+            pool.submit(read_kit, file, file_name, kit): kit
+            for file, file_name, kit in sources
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            if on_progress is not None:
+                with lock:
+                    for future in done:
+                        progress[futures[future]] = 1.0
+                    total = sum(progress.values())
+                on_progress(total / len(futures))
+            for future in done:
+                yield futures[future], future
@@ -0,0 +1,345 @@
+"""Desenho do mapa cromossômico e cache das imagens renderizadas."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+from .segments import merge_intervals
+
+FIGURE_WIDTH = 12  # Largura do mapa cromossômico, em polegadas
+REGION_PAGE_SIZE = 10  # Máximo de pessoas desenhadas por página no explorador de região
+
+# Função para gerar cores distintas para cada pessoa
+def generate_distinct_colors(n):
+    """Gera cores visualmente distintas e determinísticas (a mesma pessoa mantém a cor entre reruns)."""
+    colors = plt.cm.tab20.colors + plt.cm.tab20b.colors
+    if n <= len(colors):
+        return {i: colors[i] for i in range(n)}
+    # Gerador com semente fixa: as cores não mudam entre execuções, mantendo a chave do cache estável
+    rng = np.random.default_rng(0)
+    return {i: tuple(float(c) for c in rng.random(3)) for i in range(n)}
+
+# Função para associar uma cor a cada pessoa
+def build_color_map(comparisons):
+    """Mapa {pessoa: cor} na ordem recebida."""
+    color_palette = generate_distinct_colors(len(comparisons))
+    return {comp: color_palette[idx] for idx, comp in enumerate(comparisons)}
+
+# Função para formatar números grandes com separadores
+def format_number(num):
+    return f"{num:,}".replace(",", ".")
+
+# Função para formatar ticks do eixo x
+def format_x_ticks(x, pos):
+    """Formata os números do eixo X com separadores de milhar"""
+    return format_number(int(x))
+
+# Função para gerar os vértices de retângulos a partir de arrays de posições
+def segment_rectangles(starts, ends, y, height):
+    """Retorna um array (n, 4, 2) com os vértices dos retângulos [start, end] x [y, y + height]."""
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, 0, 1] = verts[:, 3, 1] = y
+    verts[:, 1, 1] = verts[:, 2, 1] = y + height
+    return verts
+
+# Função para montar o gráfico de cromossomos
+def build_chromosome_figure(segment_index, chrom_people, color_map, chrom_sizes, pixel_width=None):
+    """Desenha os segmentos de cada pessoa por cromossomo.
+
+    Todos os segmentos de um cromossomo são desenhados como uma única
+    PolyCollection montada a partir dos arrays do índice, em vez de um
+    Rectangle por segmento.
+
+    Com `pixel_width` (largura de saída em pixels), os segmentos de cada
+    pessoa são reduzidos a faixas de cobertura nessa resolução: intervalos
+    separados por menos de um pixel são unidos antes do desenho, e o custo
+    passa a depender da resolução e não do número de segmentos.
+    """
+    # Definir parâmetros base
+    base_chrom_height = 0.6  # Altura base para o cromossomo
+    person_height = 0.25     # Altura de cada segmento de pessoa
+    person_spacing = 0.15    # Espaçamento entre segmentos de pessoas
+    chrom_spacing = 0.8      # Espaçamento adicional entre cromossomos
+
+    # Calcular altura para cada cromossomo com base no número de pessoas
+    chrom_heights = {}
+    for chrom, people in chrom_people.items():
+        required_height = base_chrom_height + (len(people) * (person_height + person_spacing))
+        chrom_heights[chrom] = max(1.2, required_height)  # Garantir altura mínima
+
+    # Calcular posições Y acumulativas para cada cromossomo (já em ordem canônica)
+    y_positions = {}
+    y_cumulative = 0
+    for chrom in chrom_people:
+        y_positions[chrom] = y_cumulative
+        y_cumulative += chrom_heights[chrom] + chrom_spacing
+
+    # Ajustar tamanho da figura com base na altura total necessária
+    total_height = y_cumulative
+    fig_height = max(6, total_height * 0.8)  # Proporcional à altura total
+    # Figure sem pyplot: não fica registrada no estado global e pode ser
+    # montada fora da thread do script (exportação sob demanda)
+    fig = Figure(figsize=(FIGURE_WIDTH, fig_height))
+    ax = fig.subplots()
+
+    # Limite do eixo X baseado no maior cromossomo sendo exibido
+    max_chrom_size = max(chrom_sizes[chrom] for chrom in chrom_people)
+    x_max = max_chrom_size * 1.25  # 25% de margem para acomodar os nomes
+    resolution = x_max / pixel_width if pixel_width else None
+
+    for chrom, people in chrom_people.items():
+        chrom_length = chrom_sizes[chrom]
+        y_base = y_positions[chrom]
+
+        # Desenhar barra de fundo do cromossomo cobrindo exatamente o número de pessoas
+        bg_height = len(people) * (person_height + person_spacing)
+        ax.add_patch(plt.Rectangle((0, y_base), chrom_length, bg_height,
+                                  color='lightgrey', alpha=0.3))
+
+        # Reunir os retângulos de todas as pessoas deste cromossomo
+        chrom_verts = []
+        chrom_colors = []
+        for i, person in enumerate(people):
+            # Começar do topo do cromossomo e ir descendo uniformemente
+            y_offset = y_base + (i * (person_height + person_spacing))
+            color = color_map[person]
+
+            if resolution:
+                seg_starts, seg_ends = segment_index.merged(chrom, person, gap=resolution)
+            else:
+                seg_starts, seg_ends = segment_index.segments(chrom, person)
+            chrom_verts.append(segment_rectangles(seg_starts, seg_ends, y_offset, person_height))
+            chrom_colors.append(np.broadcast_to(to_rgba(color), (len(seg_starts), 4)))
+
+            # Adicionar o nome da pessoa após o cromossomo inteiro
+            text_x = chrom_length * 1.02  # Posicionar após o final do cromossomo
+            text_y = y_offset + (person_height / 2)  # Centralizar verticalmente
+            ax.text(text_x, text_y, person, fontsize=8,
+                   va='center', ha='left', color=color)
+
+        colors = np.concatenate(chrom_colors)
+        ax.add_collection(PolyCollection(
+            np.concatenate(chrom_verts), facecolors=colors, edgecolors=colors, alpha=0.8
+        ))
+
+    # Configurar eixos
+    ax.set_xlim(0, x_max)
+
+    # Ajustar limites do eixo Y para acomodar todos os cromossomos
+    ax.set_ylim(-0.5, total_height)
+
+    # Posicionar rótulos do eixo Y no centro de cada cromossomo
+    ax.set_yticks([y_positions[chrom] + (chrom_heights[chrom] / 2) for chrom in chrom_people])
+    ax.set_yticklabels([f"Chr {chrom}" for chrom in chrom_people])
+
+    # Melhorar formatação do eixo X com números formatados
+    ax.xaxis.set_major_formatter(FuncFormatter(format_x_ticks))
+
+    # Adicionar título e rótulos
+    ax.set_xlabel("Posição no Cromossomo (pb)")
+    ax.set_title("Comparação de Múltiplos DNAs por Cromossomo")
+    ax.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig
+
+# Função para montar o gráfico de uma região de um cromossomo
+def build_region_figure(segment_index, chrom, start, end, comparisons, color_map):
+    """Desenha, em resolução total, apenas os segmentos que cruzam [start, end).
+
+    Os segmentos vêm da consulta por janela do índice e são recortados aos
+    limites da região, então o custo depende do que está visível e não do
+    tamanho do conjunto de dados. A cobertura de cada pessoa é desenhada como
+    a união exata dos seus segmentos e o início/fim de cada segmento aparece
+    como um traço vertical. Retorna (figura, número de segmentos).
+    """
+    person_height = 0.25     # Altura de cada segmento de pessoa
+    person_spacing = 0.15    # Espaçamento entre segmentos de pessoas
+    row_height = person_height + person_spacing
+
+    window = segment_index.overlapping(chrom, start, end, comparisons)
+    people = [person for person in comparisons if person in window]
+
+    fig_height = max(2, 0.8 + len(people) * row_height)
+    fig = Figure(figsize=(FIGURE_WIDTH, fig_height))
+    # Margens fixas: evita o bbox_inches='tight', que desenha a figura duas vezes
+    fig.subplots_adjust(left=0.14, right=0.96, top=1 - 0.1 / fig_height, bottom=0.6 / fig_height)
+    ax = fig.subplots()
+
+    n_segments = 0
+    if people:
+        rows = np.repeat(np.arange(len(people)), [len(window[person][0]) for person in people])
+        seg_starts = np.maximum(np.concatenate([window[person][0] for person in people]), start)
+        seg_ends = np.minimum(np.concatenate([window[person][1] for person in people]), end)
+        n_segments = len(seg_starts)
+        person_colors = np.array([to_rgba(color_map[person]) for person in people])
+
+        # Cobertura: união por pessoa (já ordenada por pessoa e início)
+        block_rows, block_starts, block_ends = merge_intervals(rows, seg_starts, seg_ends)
+        block_colors = person_colors[block_rows]
+        verts = segment_rectangles(block_starts, block_ends, 0, person_height)
+        verts[:, :, 1] += (block_rows * row_height)[:, None]
+        ax.add_collection(PolyCollection(verts, facecolors=block_colors, edgecolors="none", alpha=0.8))
+
+        # Limites de cada segmento dentro da região
+        edges = np.concatenate([seg_starts[seg_starts > start], seg_ends[seg_ends < end]])
+        edge_rows = np.concatenate([rows[seg_starts > start], rows[seg_ends < end]])
+        lines = np.empty((len(edges), 2, 2))
+        lines[:, :, 0] = edges[:, None]
+        lines[:, 0, 1] = edge_rows * row_height
+        lines[:, 1, 1] = edge_rows * row_height + person_height
+        ax.add_collection(LineCollection(lines, colors='black', linewidths=0.6, alpha=0.6))
+
+        # Nomes como textos simples: mais barato que criar um tick do eixo Y por pessoa
+        for row, (person, color) in enumerate(zip(people, person_colors)):
+            ax.text(-0.01, row * row_height + person_height / 2, person, color=color, fontsize=8,
+                    ha='right', va='center', transform=ax.get_yaxis_transform())
+    else:
+        ax.text(0.5, 0.5, "Nenhum segmento nesta região", transform=ax.transAxes,
+                ha='center', va='center', color='grey')
+
+    ax.set_yticks([])
+    ax.set_xlim(start, max(end, start + 1))  # Janela vazia: evita limites iguais no eixo X
+    ax.set_ylim(-person_spacing, max(1, len(people)) * row_height)
+    ax.invert_yaxis()  # Pessoas em ordem alfabética de cima para baixo
+    ax.xaxis.set_major_formatter(FuncFormatter(format_x_ticks))
+    ax.set_xlabel(f"Posição no Cromossomo {chrom} (pb)")
+    ax.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig, n_segments
+
+# Função para montar o mapa de calor da matriz de compartilhamento
+def build_matrix_figure(names, matrix, label, max_labels=60):
+    """Mapa de calor N×N; os nomes só aparecem nos eixos até `max_labels` pessoas."""
+    size = min(12, max(6, 0.2 * len(names)))
+    fig = Figure(figsize=(size + 2, size))
+    ax = fig.subplots()
+    image = ax.imshow(matrix, cmap='viridis', interpolation='nearest')
+    colorbar = fig.colorbar(image, ax=ax, shrink=0.8)
+    colorbar.set_label(label)
+    if len(names) <= max_labels:
+        ax.set_xticks(range(len(names)))
+        ax.set_xticklabels(names, rotation=90, fontsize=7)
+        ax.set_yticks(range(len(names)))
+        ax.set_yticklabels(names, fontsize=7)
+    else:
+        ax.set_xlabel(f"{len(names)} pessoas (ordem alfabética)")
+    ax.set_title("Compartilhamento entre Pares de Pessoas")
+    return fig
+
+# Função para renderizar uma figura como PNG
+def figure_to_png(fig, dpi, tight=True, compress_level=6):
+    """PNG da figura; tight=False e compress_level baixo priorizam a velocidade."""
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight' if tight else None,
+                pil_kwargs={'compress_level': compress_level})
+    return buffer.getvalue()
+
+# Formatos de exportação do gráfico: (tipo MIME, extensão do arquivo)
+EXPORT_FORMATS = {
+    "png": ("image/png", "png"),
+    "svg": ("image/svg+xml", "svg"),
+    "pdf": ("application/pdf", "pdf"),
+    "pdf-pages": ("application/pdf", "pdf"),
+}
+
+# Função para exportar o gráfico em PNG, SVG, PDF ou PDF com uma página por cromossomo
+def export_chart(segment_index, chrom_people, color_map, chrom_sizes, fmt, dpi=300, lod=True):
+    """Bytes do gráfico no formato `fmt` (uma das chaves de EXPORT_FORMATS).
+
+    Todos os formatos usam o mesmo desenho em PolyCollection. Nos vetoriais,
+    `dpi` só define a resolução do nível de detalhe, o que limita o número de
+    retângulos no arquivo. Em "pdf-pages" cada cromossomo é montado e gravado
+    como uma página independente, então a memória não cresce com o número de
+    cromossomos e cada página tem a escala do próprio cromossomo.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação não suportado: {fmt}")
+    pixel_width = FIGURE_WIDTH * dpi if lod else None
+    if fmt == "pdf-pages":
+        buffer = BytesIO()
+        with PdfPages(buffer) as pdf:
+            for chrom, people in chrom_people.items():
+                fig = build_chromosome_figure(segment_index, {chrom: people}, color_map, chrom_sizes,
+                                              pixel_width=pixel_width)
+                pdf.savefig(fig, bbox_inches='tight')
+        return buffer.getvalue()
+
+    fig = build_chromosome_figure(segment_index, chrom_people, color_map, chrom_sizes, pixel_width=pixel_width)
+    if fmt == "png":
+        return figure_to_png(fig, dpi)
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches='tight')
+    return buffer.getvalue()
+
+# Função para calcular a chave de cache do gráfico a partir do conteúdo desenhado
+def chart_cache_key(segment_index, chrom_people, color_map, chrom_sizes):
+    """Hash dos segmentos filtrados, tamanhos dos cromossomos, cores e layout.
+
+    O hash dos segmentos de cada (cromossomo, pessoa) fica guardado no índice,
+    então após uma edição só os grupos alterados são lidos de novo.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(b"chromosome-map-v1")
+    rgba = {person: tuple(to_rgba(color)) for person, color in color_map.items()}
+    for chrom, people in chrom_people.items():
+        digest.update(f"|{chrom}:{chrom_sizes[chrom]}".encode())
+        for person in people:
+            group_cache = segment_index.aggregates(chrom, person)
+            if "digest" not in group_cache:
+                seg_starts, seg_ends = segment_index.segments(chrom, person)
+                group_digest = hashlib.blake2b(seg_starts.tobytes(), digest_size=20)
+                group_digest.update(seg_ends.tobytes())
+                group_cache["digest"] = group_digest.digest()
+            digest.update(f"|{person}:{rgba[person]}".encode())
+            digest.update(group_cache["digest"])
+    return digest.hexdigest()
+
+# Cache LRU de imagens renderizadas, limitado pelo total de bytes
+class RenderCache:
+    """Guarda bytes de imagens por chave de conteúdo, descartando as menos usadas."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key, render):
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
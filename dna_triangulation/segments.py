@@ -0,0 +1,422 @@
+"""Modelo de dados dos segmentos: validação, tipagem e índice por cromossomo."""
+
+import numpy as np
+import pandas as pd
+
+# Tamanhos reais dos cromossomos (baseado na tabela fornecida)
+CHROMOSOME_SIZES = {
+    1: 249154567, 2: 242942878, 3: 197526201, 4: 190685303, 5: 181538259,
+    6: 170814183, 7: 158878256, 8: 145919126, 9: 140928675, 10: 135352153,
+    11: 134803123, 12: 130100796, 13: 115008038, 14: 105916797, 15: 102247864,
+    16: 90103117, 17: 80924707, 18: 77869022, 19: 58864479, 20: 62729431,
+    21: 47560946, 22: 51072161, 'X': 155270560, 'Y': 59373566
+}
+
+# Colunas obrigatórias e ordem canônica dos cromossomos
+REQUIRED_COLUMNS = ["Chr", "Start", "End", "Comparison"]
+CHROM_ORDER = list(range(1, 23)) + ['X', 'Y']
+
+# Posições em int32: cabem no maior cromossomo (~249 Mb) com folga e, por serem
+# com sinal, diferenças entre posições (lacunas) não dão a volta como em uint32
+POSITION_DTYPE = np.int32
+POSITION_MAX = int(np.iinfo(POSITION_DTYPE).max)
+
+# Posição em texto com separadores de milhar (1.234.567, 1,234,567 ou 1 234 567)
+THOUSANDS_PATTERN = r"\d{1,3}(?:[.,\s]\d{3})+"
+
+# Kit usado quando os segmentos não vêm de um arquivo (entrada manual)
+DEFAULT_KIT = "Principal"
+KIT_SEPARATOR = " / "
+
+# Função para normalizar um rótulo de cromossomo (1, "1", 1.0, "chr1", "x"...)
+def normalize_chrom_label(value):
+    """Converte um rótulo de cromossomo para o formato canônico ou None se inválido."""
+    label = str(value).strip().upper()
+    if label.startswith("CHR"):
+        label = label[3:].strip()
+    if label.endswith(".0"):
+        label = label[:-2]
+    if label in ("X", "Y"):
+        return label
+    if label.isdigit() and 1 <= int(label) <= 22:
+        return int(label)
+    return None
+
+# Função para converter uma coluna de posições em inteiros, aceitando pontuação de milhar
+def coerce_positions(values):
+    """Converte posições para float de forma vetorizada; valores inválidos viram NaN.
+
+    Em colunas de texto, pontos, vírgulas e espaços só são tratados como
+    separadores de milhar quando agrupam os dígitos de três em três
+    ("1.234.567"); os demais valores são convertidos como número, então
+    "1234567.5" continua fracionário e é rejeitado na validação.
+    """
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype("string").str.strip()
+        grouped = values.str.fullmatch(THOUSANDS_PATTERN).fillna(False)
+        values = values.where(~grouped, values.str.replace(r"[.,\s]", "", regex=True))
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+# Função para criar um DataFrame de segmentos vazio já tipado
+def empty_segments():
+    return pd.DataFrame({
+        "Chr": pd.Categorical([], categories=CHROM_ORDER, ordered=True),
+        "Start": pd.Series([], dtype=POSITION_DTYPE),
+        "End": pd.Series([], dtype=POSITION_DTYPE),
+        "Comparison": pd.Categorical([]),
+        "Kit": pd.Categorical([]),
+    })
+
+# Função para validar e tipar segmentos importados em bloco
+def ingest_segments(raw_df, kit=DEFAULT_KIT):
+    """Valida as colunas Chr/Start/End/Comparison de forma vetorizada.
+
+    Retorna uma tupla (segmentos, erros): os segmentos válidos como DataFrame
+    tipado (Chr, Comparison e Kit categóricos, posições int32) e um relatório
+    com a linha do arquivo e o motivo de cada linha rejeitada. Todos os
+    segmentos recebem o `kit` informado.
+    """
+    # Normalizar os rótulos de cromossomo apenas sobre os valores únicos
+    chrom_codes, chrom_uniques = pd.factorize(raw_df["Chr"])
+    normalized = [normalize_chrom_label(value) for value in chrom_uniques]
+    chrom_index = np.array(
+        [CHROM_ORDER.index(value) if value is not None else -1 for value in normalized] + [-1]
+    )
+    chrom_idx = chrom_index[chrom_codes]  # código -1 (valor ausente) aponta para o -1 final
+
+    starts = coerce_positions(raw_df["Start"])
+    ends = coerce_positions(raw_df["End"])
+    comparisons = raw_df["Comparison"].astype("string").str.strip()
+
+    checks = [
+        ("Cromossomo inválido", chrom_idx < 0),
+        ("Start inválido", (starts.isna() | (starts < 0) | (starts > POSITION_MAX) | (starts % 1 != 0)).to_numpy()),
+        ("End inválido", (ends.isna() | (ends < 0) | (ends > POSITION_MAX) | (ends % 1 != 0)).to_numpy()),
+        ("End deve ser maior que Start", (ends <= starts).to_numpy()),
+        ("Comparison vazio", (comparisons.isna() | (comparisons == "")).fillna(True).to_numpy()),
+    ]
+    bad = np.logical_or.reduce([mask for _, mask in checks])
+
+    # Relatório de erros por linha (linha 1 é o cabeçalho do arquivo)
+    messages = np.full(int(bad.sum()), "", dtype=object)
+    for message, mask in checks:
+        messages = np.where(mask[bad], messages + message + "; ", messages)
+    errors = pd.DataFrame({
+        "Linha": np.asarray(raw_df.index)[bad] + 2,
+        "Erro": pd.Series(messages, dtype="string").str.rstrip("; "),
+    })
+
+    ok = ~bad
+    segments = pd.DataFrame({
+        "Chr": pd.Categorical.from_codes(chrom_idx[ok], categories=CHROM_ORDER, ordered=True),
+        "Start": starts.to_numpy()[ok].astype(POSITION_DTYPE),
+        "End": ends.to_numpy()[ok].astype(POSITION_DTYPE),
+        "Comparison": pd.Categorical(comparisons.to_numpy()[ok].astype(str)),
+        "Kit": pd.Categorical.from_codes(np.zeros(int(ok.sum()), dtype=np.int8), categories=[kit]),
+    })
+    return segments, errors
+
+# Função para concatenar vários DataFrames de segmentos tipados de uma só vez
+def concat_segments(parts):
+    """Concatena DataFrames de segmentos preservando as colunas categóricas."""
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return empty_segments()
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    categories = {}
+    for column in ("Comparison", "Kit"):
+        categories[column] = parts[0][column].cat.categories
+        for part in parts[1:]:
+            categories[column] = categories[column].union(part[column].cat.categories, sort=False)
+    parts = [
+        part.assign(**{column: part[column].cat.set_categories(values) for column, values in categories.items()})
+        for part in parts
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+# Função para acrescentar segmentos tipados ao conjunto existente
+def append_segments(segments, new_segments):
+    """Concatena dois DataFrames de segmentos preservando as colunas categóricas."""
+    if new_segments.empty:
+        return segments
+    return concat_segments([segments, new_segments])
+
+# Função para contar os kits presentes nos segmentos
+def count_kits(segments):
+    return segments["Kit"].nunique()
+
+# Função para gerar os rótulos de pessoa usados no índice
+def comparison_labels(segments, qualified):
+    """Categorical com o nome de cada pessoa; com `qualified`, prefixado pelo kit.
+
+    Com vários kits na sessão, a mesma pessoa pode aparecer em kits
+    diferentes, então o rótulo passa a ser "Kit / Pessoa". Os rótulos são
+    montados sobre os pares de códigos únicos, não linha a linha.
+    """
+    if not qualified:
+        return segments["Comparison"].array
+    comp_labels = segments["Comparison"].cat.categories
+    kit_labels = segments["Kit"].cat.categories
+    pairs = (segments["Kit"].cat.codes.to_numpy().astype(np.int64) * len(comp_labels)
+             + segments["Comparison"].cat.codes.to_numpy())
+    unique_pairs, inverse = np.unique(pairs, return_inverse=True)
+    labels = [
+        f"{kit_labels[pair // len(comp_labels)]}{KIT_SEPARATOR}{comp_labels[pair % len(comp_labels)]}"
+        for pair in unique_pairs
+    ]
+    return pd.Categorical.from_codes(inverse.ravel(), categories=labels)
+
+# Função para preparar os segmentos para exibição (Arrow não aceita categorias mistas int/str)
+def segments_for_display(df):
+    return df.assign(Chr=df["Chr"].cat.rename_categories([str(c) for c in df["Chr"].cat.categories]))
+
+# Função para calcular o máximo acumulado dos fins dentro de cada grupo
+def group_running_max(groups, ends):
+    """Máximo acumulado de `ends` reiniciado a cada grupo (grupos em ordem crescente).
+
+    Cada grupo é deslocado para uma faixa própria de valores, de modo que um
+    único np.maximum.accumulate não mistura grupos vizinhos.
+    """
+    if len(ends) == 0:
+        return ends
+    shift = int(ends.max()) + 1
+    # groups * shift promove para int64; o resultado volta ao tipo dos fins
+    return (np.maximum.accumulate(groups * shift + ends) - groups * shift).astype(ends.dtype)
+
+# Função para unir intervalos sobrepostos dentro de cada grupo
+def merge_intervals(groups, starts, ends):
+    """União de intervalos ordenados por (grupo, início), de forma vetorizada.
+
+    Retorna (groups, starts, ends) dos blocos disjuntos resultantes, ainda
+    ordenados por grupo e início.
+    """
+    if len(starts) == 0:
+        return groups, starts, ends
+    max_ends = group_running_max(groups, ends)
+    first = np.flatnonzero(np.r_[
+        True, (groups[1:] != groups[:-1]) | (starts[1:] > max_ends[:-1])
+    ])
+    return groups[first], starts[first], np.r_[max_ends[first[1:] - 1], max_ends[-1:]]
+
+# Índice de segmentos por cromossomo e pessoa para consultas por intervalo
+class SegmentIndex:
+    """Segmentos agrupados por (cromossomo, pessoa) e ordenados por Start.
+
+    Cada grupo guarda os arrays de início e fim e o máximo acumulado dos fins,
+    o que permite achar por busca binária os segmentos que se sobrepõem a uma
+    janela [start, end) em O(log n + k), sem varrer o DataFrame inteiro.
+    """
+
+    def __init__(self, segments):
+        self._groups = {}
+        self._by_chrom = {}
+        self._aggregates = {}
+        self._kits = {}
+        # Com mais de um kit, as pessoas são identificadas por "Kit / Pessoa"
+        self.qualified = count_kits(segments) > 1
+        if segments.empty:
+            return
+
+        comparisons = comparison_labels(segments, self.qualified)
+        self._record_kits(segments, comparisons)
+        chrom_codes = segments["Chr"].cat.codes.to_numpy().astype(np.int64)
+        comp_codes = comparisons.codes.astype(np.int64)
+        order = np.lexsort((segments["Start"].to_numpy(), comp_codes, chrom_codes))
+        starts = segments["Start"].to_numpy()[order]
+        ends = segments["End"].to_numpy()[order]
+        keys = (chrom_codes * len(comparisons.categories) + comp_codes)[order]
+
+        max_ends = group_running_max(keys, ends)
+
+        bounds = np.r_[0, np.flatnonzero(np.diff(keys)) + 1, len(keys)]
+        chrom_labels = segments["Chr"].cat.categories
+        comp_labels = comparisons.categories
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            chrom = chrom_labels[chrom_codes[order[lo]]]
+            comparison = comp_labels[comp_codes[order[lo]]]
+            self._groups[(chrom, comparison)] = (starts[lo:hi], ends[lo:hi], max_ends[lo:hi])
+            self._by_chrom.setdefault(chrom, []).append(comparison)
+
+    # Função para substituir os arrays de um grupo após uma edição
+    def _set_group(self, key, starts, ends):
+        """Reordena e grava um grupo alterado; grupos vazios são removidos."""
+        chrom, comparison = key
+        self._aggregates.pop(key, None)
+        if len(starts) == 0:
+            if self._groups.pop(key, None) is not None:
+                self._by_chrom[chrom].remove(comparison)
+                if not self._by_chrom[chrom]:
+                    del self._by_chrom[chrom]
+            return
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        if key not in self._groups:
+            self._by_chrom.setdefault(chrom, []).append(comparison)
+        self._groups[key] = (starts, ends, np.maximum.accumulate(ends))
+
+    # Função para registrar o kit de cada rótulo de pessoa
+    def _record_kits(self, segments, comparisons):
+        kit_codes = segments["Kit"].cat.codes.to_numpy()
+        first_rows = np.unique(comparisons.codes, return_index=True)[1]
+        for row in first_rows:
+            self._kits[comparisons[row]] = segments["Kit"].cat.categories[kit_codes[row]]
+
+    # Função para iterar os segmentos de um DataFrame agrupados por (cromossomo, pessoa)
+    def _split_by_group(self, segments):
+        """Agrupa pelos códigos inteiros das categorias, sem comparar rótulos."""
+        if segments.empty:
+            return
+        comparisons = comparison_labels(segments, self.qualified)
+        self._record_kits(segments, comparisons)
+        chrom_codes = segments["Chr"].cat.codes.to_numpy().astype(np.int64)
+        comp_codes = comparisons.codes.astype(np.int64)
+        keys = chrom_codes * len(comparisons.categories) + comp_codes
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = segments["Start"].to_numpy(dtype=POSITION_DTYPE)[order]
+        ends = segments["End"].to_numpy(dtype=POSITION_DTYPE)[order]
+        chrom_labels = segments["Chr"].cat.categories
+        comp_labels = comparisons.categories
+        bounds = np.r_[0, np.flatnonzero(np.diff(keys)) + 1, len(keys)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            first = order[lo]
+            key = (chrom_labels[chrom_codes[first]], comp_labels[comp_codes[first]])
+            yield key, starts[lo:hi], ends[lo:hi]
+
+    def add(self, segments):
+        """Acrescenta segmentos tipados, refazendo apenas os grupos afetados."""
+        for key, new_starts, new_ends in self._split_by_group(segments):
+            starts, ends, _ = self._groups.get(key, (new_starts[:0], new_ends[:0], None))
+            self._set_group(key, np.concatenate([starts, new_starts]), np.concatenate([ends, new_ends]))
+
+    def remove(self, segments):
+        """Remove uma ocorrência de cada segmento informado, refazendo apenas os grupos afetados."""
+        for key, old_starts, old_ends in self._split_by_group(segments):
+            if key not in self._groups:
+                continue
+            starts, ends, _ = self._groups[key]
+            keep = np.ones(len(starts), dtype=bool)
+            for start, end in zip(old_starts, old_ends):
+                lo = np.searchsorted(starts, start, side="left")
+                hi = np.searchsorted(starts, start, side="right")
+                match = np.flatnonzero((ends[lo:hi] == end) & keep[lo:hi])
+                if len(match):
+                    keep[lo + match[0]] = False
+            self._set_group(key, starts[keep], ends[keep])
+
+    def aggregates(self, chrom, comparison):
+        """Dicionário de valores derivados de um grupo, descartado quando o grupo muda.
+
+        Usado pelas estatísticas e pela chave de cache do gráfico para
+        recalcular só os grupos editados.
+        """
+        return self._aggregates.setdefault((chrom, comparison), {})
+
+    def kits(self):
+        """Kits com segmentos no índice, em ordem alfabética."""
+        return sorted({self._kits[comparison] for _, comparison in self._groups})
+
+    def kit_of(self, comparison):
+        """Kit de onde vêm os segmentos de uma pessoa."""
+        return self._kits[comparison]
+
+    def __len__(self):
+        return sum(len(group[0]) for group in self._groups.values())
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays dos grupos."""
+        return sum(array.nbytes for group in self._groups.values() for array in group)
+
+    def chromosomes(self):
+        """Cromossomos com segmentos, na ordem canônica."""
+        return [chrom for chrom in CHROM_ORDER if chrom in self._by_chrom]
+
+    def comparisons(self, chrom=None):
+        """Pessoas com segmentos (em um cromossomo, se informado), em ordem alfabética."""
+        if chrom is not None:
+            return sorted(self._by_chrom.get(chrom, []))
+        return sorted({comparison for _, comparison in self._groups})
+
+    def people_by_chromosome(self, chroms=None, comparisons=None):
+        """Pessoas com segmentos em cada cromossomo, filtradas pela seleção.
+
+        Retorna {cromossomo: [pessoas]} na ordem canônica dos cromossomos,
+        omitindo cromossomos sem nenhuma pessoa selecionada.
+        """
+        selected = None if comparisons is None else set(comparisons)
+        chrom_people = {}
+        for chrom in self.chromosomes():
+            if chroms is not None and chrom not in chroms:
+                continue
+            people = [p for p in self.comparisons(chrom) if selected is None or p in selected]
+            if people:
+                chrom_people[chrom] = people
+        return chrom_people
+
+    def segments(self, chrom, comparison):
+        """Arrays (starts, ends) de uma pessoa em um cromossomo, ordenados por Start."""
+        starts, ends, _ = self._groups[(chrom, comparison)]
+        return starts, ends
+
+    def merged(self, chrom, comparison, gap=0):
+        """União dos segmentos de uma pessoa em um cromossomo, como arrays disjuntos.
+
+        Com `gap` > 0, segmentos separados por até `gap` pb também são unidos
+        (usado para reduzir o desenho à resolução de saída).
+        """
+        starts, ends, max_ends = self._groups[(chrom, comparison)]
+        run_starts = np.flatnonzero(np.r_[True, starts[1:] > max_ends[:-1] + gap])
+        return starts[run_starts], np.r_[max_ends[run_starts[1:] - 1], max_ends[-1:]]
+
+    def overlapping(self, chrom, start, end, comparisons=None):
+        """Segmentos que se sobrepõem à janela [start, end), por pessoa.
+
+        Retorna um dicionário {pessoa: (starts, ends)} apenas com as pessoas
+        que têm ao menos um segmento na janela (nenhuma se a janela for vazia).
+        """
+        result = {}
+        if end <= start:
+            return result
+        wanted = None if comparisons is None else set(comparisons)
+        for comparison in self.comparisons(chrom):
+            if wanted is not None and comparison not in wanted:
+                continue
+            starts, ends, max_ends = self._groups[(chrom, comparison)]
+            lo = np.searchsorted(max_ends, start, side="right")
+            hi = np.searchsorted(starts, end, side="left")
+            keep = ends[lo:hi] > start
+            if keep.any():
+                result[comparison] = (starts[lo:hi][keep], ends[lo:hi][keep])
+        return result
+
+    def selection(self, chroms, comparisons):
+        """Segmentos selecionados concatenados, agrupados por (pessoa, cromossomo).
+
+        Retorna (keys, groups, starts, ends): a lista de pares (pessoa,
+        cromossomo) em ordem de pessoa e cromossomo, e para cada segmento o
+        número do seu par em `keys`, com os segmentos de cada par ordenados
+        por Start.
+        """
+        keys = [
+            (comparison, chrom)
+            for comparison in sorted(set(comparisons))
+            for chrom in chroms
+            if (chrom, comparison) in self._groups
+        ]
+        return (keys, *self.gather(keys))
+
+    def gather(self, keys):
+        """Concatena os segmentos dos pares (pessoa, cromossomo) em `keys`.
+
+        Retorna (groups, starts, ends), com o número do par de cada segmento.
+        """
+        parts = [self._groups[(chrom, comparison)] for comparison, chrom in keys]
+        if not parts:
+            empty = np.array([], dtype=POSITION_DTYPE)
+            return np.array([], dtype=np.int64), empty, empty
+        groups = np.repeat(np.arange(len(keys)), [len(part[0]) for part in parts])
+        starts = np.concatenate([part[0] for part in parts])
+        ends = np.concatenate([part[1] for part in parts])
+        return groups, starts, ends
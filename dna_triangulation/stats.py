@@ -0,0 +1,116 @@
+"""Estatísticas de cobertura por pessoa e cromossomo."""
+
+import numpy as np
+import pandas as pd
+
+from .segments import merge_intervals
+
+STAT_COLUMNS = ["Total_Segments", "Total_Size", "Covered_Size", "Largest_Segment",
+                "Gap_Count", "Gap_Size", "Largest_Gap"]
+
+# Função para calcular, de forma vetorizada, as estatísticas de vários grupos
+def group_stats(segment_index, keys):
+    """Matriz (len(keys), len(STAT_COLUMNS)) com as estatísticas de cada par (pessoa, cromossomo)."""
+    n_groups = len(keys)
+    groups, starts, ends = segment_index.gather(keys)
+    block_groups, block_starts, block_ends = merge_intervals(groups, starts, ends)
+    block_sizes = block_ends - block_starts
+
+    # Lacunas entre blocos consecutivos do mesmo grupo
+    same_group = block_groups[1:] == block_groups[:-1]
+    gap_groups = block_groups[1:][same_group]
+    gap_sizes = (block_starts[1:] - block_ends[:-1])[same_group]
+
+    largest_block = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(largest_block, block_groups, block_sizes)
+    largest_gap = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(largest_gap, gap_groups, gap_sizes)
+
+    return np.column_stack([
+        np.bincount(groups, minlength=n_groups),
+        np.bincount(groups, weights=ends - starts, minlength=n_groups).astype(np.int64),
+        np.bincount(block_groups, weights=block_sizes, minlength=n_groups).astype(np.int64),
+        largest_block,
+        np.bincount(gap_groups, minlength=n_groups),
+        np.bincount(gap_groups, weights=gap_sizes, minlength=n_groups).astype(np.int64),
+        largest_gap,
+    ]).astype(np.int64)
+
+# Função para calcular estatísticas de cobertura sem contar sobreposições duas vezes
+def coverage_stats(segment_index, chroms, comparisons, chrom_sizes):
+    """Estatísticas por (pessoa, cromossomo) a partir da união dos segmentos.
+
+    Segmentos sobrepostos ou duplicados são unidos antes de somar, então a
+    cobertura nunca passa de 100%. Inclui também o maior bloco contínuo e as
+    lacunas entre blocos. Os valores de cada par ficam guardados no índice e
+    só são recalculados para os pares alterados desde a última chamada.
+    """
+    keys = segment_index.selection(chroms, comparisons)[0]
+    missing = [key for key in keys if "coverage" not in segment_index.aggregates(key[1], key[0])]
+    if missing:
+        for (comparison, chrom), row in zip(missing, group_stats(segment_index, missing)):
+            segment_index.aggregates(chrom, comparison)["coverage"] = row
+
+    values = np.array(
+        [segment_index.aggregates(chrom, comparison)["coverage"] for comparison, chrom in keys],
+        dtype=np.int64,
+    ).reshape(len(keys), len(STAT_COLUMNS))
+    stats = pd.DataFrame(values, columns=STAT_COLUMNS)
+    stats.insert(0, "Comparison", [comparison for comparison, _ in keys])
+    stats.insert(1, "Chr", pd.Series([chrom for _, chrom in keys], dtype=object))
+    stats["Chromosome_Size"] = stats["Chr"].map(chrom_sizes)
+    stats["Coverage_Percentage"] = (stats["Covered_Size"] / stats["Chromosome_Size"] * 100).round(2)
+    return stats
+
+# Função para calcular a cobertura da união dos segmentos de várias pessoas
+def union_coverage(segment_index, chroms, comparisons):
+    """Segmentos, pb cobertos por ao menos uma das pessoas e cromossomos com cobertura."""
+    keys, groups, starts, ends = segment_index.selection(chroms, comparisons)
+    chrom_position = {chrom: position for position, chrom in enumerate(chroms)}
+    chrom_groups = np.array([chrom_position[chrom] for _, chrom in keys], dtype=np.int64)[groups]
+    order = np.lexsort((starts, chrom_groups))
+    union_groups, union_starts, union_ends = merge_intervals(
+        chrom_groups[order], starts[order], ends[order]
+    )
+    return {
+        "Total_Segments": len(starts),
+        "Covered_Size": int((union_ends - union_starts).sum()),
+        "Chromosomes": len(np.unique(union_groups)),
+    }
+
+# Função para calcular os totais no genoma por pessoa e da união de todas as pessoas
+def genome_coverage(segment_index, chroms, comparisons, chrom_sizes, stats):
+    """Totais por pessoa somados sobre os cromossomos, mais uma linha com a união de todos.
+
+    `stats` é o resultado de coverage_stats; a cobertura é relativa ao tamanho
+    somado dos cromossomos em `chroms`.
+    """
+    genome_size = sum(chrom_sizes[chrom] for chrom in chroms)
+    totals = stats.groupby("Comparison", sort=True).agg(
+        Total_Segments=pd.NamedAgg(column="Total_Segments", aggfunc="sum"),
+        Covered_Size=pd.NamedAgg(column="Covered_Size", aggfunc="sum"),
+        Chromosomes=pd.NamedAgg(column="Chr", aggfunc="count"),
+    ).reset_index()
+
+    # União entre todas as pessoas: mesmos segmentos, agrupados só por cromossomo
+    union_row = pd.DataFrame([{
+        "Comparison": "Todas as pessoas (união)",
+        **union_coverage(segment_index, chroms, comparisons),
+    }])
+    totals = pd.concat([totals, union_row], ignore_index=True)
+    totals["Coverage_Percentage"] = (totals["Covered_Size"] / genome_size * 100).round(2)
+    return totals
+
+# Função para comparar a cobertura de cada kit
+def kit_coverage(segment_index, chroms, comparisons, chrom_sizes):
+    """Por kit: pessoas selecionadas e a união dos seus segmentos nos cromossomos escolhidos."""
+    genome_size = sum(chrom_sizes[chrom] for chrom in chroms)
+    rows = []
+    for kit in segment_index.kits():
+        kit_people = [person for person in comparisons if segment_index.kit_of(person) == kit]
+        if kit_people:
+            rows.append({"Kit": kit, "People": len(kit_people),
+                         **union_coverage(segment_index, chroms, kit_people)})
+    totals = pd.DataFrame(rows, columns=["Kit", "People", "Total_Segments", "Covered_Size", "Chromosomes"])
+    totals["Coverage_Percentage"] = (totals["Covered_Size"] / genome_size * 100).round(2)
+    return totals
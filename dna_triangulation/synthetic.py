@@ -0,0 +1,40 @@
+"""Gerador de conjuntos sintéticos de segmentos para testes de desempenho."""
+
+import numpy as np
+import pandas as pd
+
+from .segments import CHROM_ORDER, CHROMOSOME_SIZES
+
+# Função para gerar segmentos sintéticos com distribuição realista
+def synthetic_segments(n_segments, n_comparisons=20, chrom_sizes=CHROMOSOME_SIZES, seed=0,
+                       include_y=False, median_length=5_000_000):
+    """Gera um DataFrame bruto com as colunas Chr/Start/End/Comparison.
+
+    Os cromossomos são sorteados proporcionalmente ao tamanho em
+    `chrom_sizes`, os tamanhos dos segmentos seguem uma log-normal em torno
+    de `median_length` (limitada a metade do cromossomo) e algumas pessoas
+    compartilham bem mais segmentos que outras, como em listas de matches
+    reais. O resultado tem o formato de um arquivo importado, pronto para
+    ingest_segments.
+    """
+    rng = np.random.default_rng(seed)
+    chroms = [chrom for chrom in CHROM_ORDER if chrom in chrom_sizes and (include_y or chrom != 'Y')]
+    sizes = np.array([chrom_sizes[chrom] for chrom in chroms], dtype=np.int64)
+
+    chrom_idx = rng.choice(len(chroms), size=n_segments, p=sizes / sizes.sum())
+    chrom_length = sizes[chrom_idx]
+    lengths = rng.lognormal(np.log(median_length), 0.8, size=n_segments)
+    lengths = np.clip(lengths, 100_000, chrom_length // 2).astype(np.int64)
+    starts = (rng.random(n_segments) * (chrom_length - lengths)).astype(np.int64)
+
+    # Pesos de Dirichlet: poucas pessoas concentram boa parte dos segmentos
+    comparison_weights = rng.dirichlet(np.full(n_comparisons, 0.7))
+    comparison_idx = rng.choice(n_comparisons, size=n_segments, p=comparison_weights)
+    names = np.array([f"Pessoa {i + 1:04d}" for i in range(n_comparisons)], dtype=object)
+
+    return pd.DataFrame({
+        "Chr": np.array(chroms, dtype=object)[chrom_idx],
+        "Start": starts,
+        "End": starts + lengths,
+        "Comparison": names[comparison_idx],
+    })
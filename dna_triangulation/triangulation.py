@@ -0,0 +1,83 @@
+"""Detecção de regiões compartilhadas por várias pessoas (triangulação)."""
+
+import numpy as np
+import pandas as pd
+
+# Função para decompor um cromossomo em intervalos elementares com suas pessoas
+def elementary_membership(blocks):
+    """Varredura das fronteiras de blocos disjuntos de várias pessoas.
+
+    Recebe uma lista de (código da pessoa, starts, ends) com blocos já unidos
+    e retorna (bounds, interval, comp): as fronteiras ordenadas, que definem
+    os intervalos elementares [bounds[i], bounds[i + 1]), e, para cada par
+    (intervalo, pessoa) presente, o índice do intervalo e o código da pessoa.
+    """
+    block_starts = np.concatenate([starts for _, starts, _ in blocks])
+    block_ends = np.concatenate([ends for _, _, ends in blocks])
+    block_comps = np.concatenate([np.full(len(starts), code) for code, starts, _ in blocks])
+
+    bounds = np.unique(np.r_[block_starts, block_ends])
+    first = np.searchsorted(bounds, block_starts)
+    spans = np.searchsorted(bounds, block_ends) - first
+
+    # Expandir cada bloco nos intervalos elementares que ele cobre
+    block_of = np.repeat(np.arange(len(first)), spans)
+    offsets = np.arange(len(block_of)) - np.repeat(np.cumsum(spans) - spans, spans)
+    return bounds, first[block_of] + offsets, block_comps[block_of]
+
+# Função para encontrar regiões compartilhadas por várias pessoas (triangulação)
+def triangulate(segment_index, chroms, comparisons, min_comparisons=2, min_length=0):
+    """Regiões onde ao menos `min_comparisons` pessoas têm segmentos sobrepostos.
+
+    Para cada cromossomo, os segmentos de cada pessoa são unidos e as
+    fronteiras de todas as pessoas são varridas em ordem; cada intervalo
+    elementar vira uma região, com início, fim, tamanho em pb e a lista de
+    pessoas (pares, trios, ...). Como os blocos unidos de uma pessoa não se
+    encostam e toda fronteira é início ou fim de algum bloco, o conjunto de
+    pessoas sempre muda entre intervalos vizinhos.
+    """
+    comp_names = sorted(set(comparisons))
+    comp_codes = {name: code for code, name in enumerate(comp_names)}
+    names = np.array(comp_names, dtype=object)
+
+    results = []
+    for chrom in chroms:
+        blocks = [
+            (comp_codes[person], *segment_index.merged(chrom, person))
+            for person in segment_index.comparisons(chrom) if person in comp_codes
+        ]
+        if len(blocks) < min_comparisons:
+            continue
+        bounds, interval, comp = elementary_membership(blocks)
+
+        counts = np.bincount(interval, minlength=len(bounds) - 1)
+        keep = counts[interval] >= min_comparisons
+        if not keep.any():
+            continue
+        order = np.lexsort((comp[keep], interval[keep]))
+        interval, comp = interval[keep][order], comp[keep][order]
+
+        # Uma região por intervalo elementar, com as pessoas em ordem alfabética
+        group_first = np.flatnonzero(np.r_[True, np.diff(interval) != 0])
+        group_interval = interval[group_first]
+        region_starts = bounds[group_interval]
+        region_ends = bounds[group_interval + 1]
+
+        member_bounds = np.r_[group_first, len(comp)]
+        members = [
+            "; ".join(names[comp[lo:hi]])
+            for lo, hi in zip(member_bounds[:-1], member_bounds[1:])
+        ]
+        results.append(pd.DataFrame({
+            "Chr": chrom,
+            "Start": region_starts,
+            "End": region_ends,
+            "Length": region_ends - region_starts,
+            "Num_Comparisons": counts[group_interval],
+            "Comparisons": members,
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=["Chr", "Start", "End", "Length", "Num_Comparisons", "Comparisons"])
+    regions = pd.concat(results, ignore_index=True)
+    return regions[regions["Length"] >= min_length].reset_index(drop=True)
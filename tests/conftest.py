@@ -0,0 +1,10 @@
+"""Fixtures compartilhadas pelos testes."""
+
+import pytest
+
+from tests.helpers import random_segments
+
+
+@pytest.fixture
+def segments():
+    return random_segments(400)
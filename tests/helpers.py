@@ -0,0 +1,44 @@
+"""Dados aleatórios pequenos e referências ingênuas para comparar com os algoritmos."""
+
+import numpy as np
+import pandas as pd
+
+from dna_triangulation import ingest_segments
+
+# Cromossomos curtos: as posições se repetem com frequência, gerando sobreposições,
+# segmentos duplicados e segmentos que apenas se encostam
+TEST_CHROM_SIZES = {1: 600, 2: 400, 'X': 300}
+
+
+# Função para gerar segmentos tipados aleatórios
+def random_segments(n_segments, n_people=6, seed=0, kit="Principal"):
+    rng = np.random.default_rng(seed)
+    chroms = rng.choice(len(TEST_CHROM_SIZES), size=n_segments)
+    sizes = np.array(list(TEST_CHROM_SIZES.values()))[chroms]
+    lengths = rng.integers(1, 80, size=n_segments)
+    starts = (rng.random(n_segments) * (sizes - lengths)).astype(np.int64) // 5 * 5
+    segments, errors = ingest_segments(pd.DataFrame({
+        "Chr": np.array(list(TEST_CHROM_SIZES), dtype=object)[chroms],
+        "Start": starts,
+        "End": starts + lengths,
+        "Comparison": [f"Pessoa {i}" for i in rng.integers(0, n_people, size=n_segments)],
+    }), kit)
+    assert errors.empty
+    return segments
+
+
+# Função para marcar, posição a posição, a cobertura de cada pessoa
+def coverage_bitmaps(segments):
+    """{(cromossomo, pessoa): array booleano com as posições cobertas}."""
+    bitmaps = {}
+    for chrom, comparison, start, end in zip(segments["Chr"], segments["Comparison"],
+                                             segments["Start"], segments["End"]):
+        bitmap = bitmaps.setdefault((chrom, comparison), np.zeros(TEST_CHROM_SIZES[chrom], dtype=bool))
+        bitmap[start:end] = True
+    return bitmaps
+
+
+# Função para listar os trechos contínuos verdadeiros de um array booleano
+def true_runs(bitmap):
+    edges = np.diff(np.r_[0, bitmap.astype(np.int8), 0])
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
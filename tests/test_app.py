@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dna_triangulation import REGION_PAGE_SIZE, ingest_segments
+
+testing = pytest.importorskip("streamlit.testing.v1")
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+@pytest.fixture
+def app():
+    return testing.AppTest.from_file(str(APP_PATH), default_timeout=30).run()
+
+
+# Função para preencher e enviar o formulário de entrada manual
+def add_segment(app, person, chrom, start, end):
+    inputs = {widget.label.split()[0]: widget for widget in app.text_input}
+    inputs["Nome"].input(person)
+    inputs["Start"].input(start)
+    inputs["End"].input(end)
+    next(widget for widget in app.selectbox if widget.label == "Cromossomo:").select(chrom)
+    next(button for button in app.button if button.label == "Adicionar Segmento").click()
+    app.run()
+    assert not app.exception
+
+
+# Função para achar um multiselect pelo prefixo da chave
+def multiselect(app, prefix):
+    return next(widget for widget in app.multiselect if widget.key and widget.key.startswith(prefix))
+
+
+def test_triangulation_selection_follows_new_segments(app):
+    add_segment(app, "Ana", 1, "1.000.000", "5.000.000")
+    add_segment(app, "Bia", 1, "2.000.000", "6.000.000")
+    add_segment(app, "Caio", 2, "1.000.000", "5.000.000")
+
+    assert multiselect(app, "tri_people").value == ["Ana", "Bia", "Caio"]
+    assert multiselect(app, "tri_chroms").value == [1, 2]
+    regions = app.session_state["triangulation"][0]
+    assert list(regions[["Start", "End", "Comparisons"]].itertuples(index=False, name=None)) == [
+        (2_000_000, 5_000_000, "Ana; Bia"),
+    ]
+
+
+def test_triangulation_selection_after_clearing_data(app):
+    add_segment(app, "Ana", 1, "1.000.000", "5.000.000")
+    next(button for button in app.button if button.label == "Limpar todos os dados").click()
+    app.run()
+    add_segment(app, "Bia", 1, "2.000.000", "6.000.000")
+    add_segment(app, "Caio", 1, "3.000.000", "4.000.000")
+
+    assert multiselect(app, "tri_people").value == ["Bia", "Caio"]
+    assert len(app.session_state["triangulation"][0]) == 1
+
+
+def test_matrix_selection_follows_new_segments(app):
+    add_segment(app, "Ana", 1, "1.000.000", "5.000.000")
+    add_segment(app, "Bia", 1, "2.000.000", "6.000.000")
+    add_segment(app, "Caio", 2, "1.000.000", "5.000.000")
+
+    assert multiselect(app, "matrix_people").value == ["Ana", "Bia", "Caio"]
+    assert multiselect(app, "matrix_chroms").value == [1, 2]
+    names, shared_bp, _ = app.session_state["shared_matrix"]
+    assert list(names) == ["Ana", "Bia", "Caio"]
+    assert shared_bp[0, 1] == 3_000_000
+
+
+# Função para abrir o aplicativo com segmentos já carregados na sessão
+def app_with_segments(n_people):
+    segments, errors = ingest_segments(pd.DataFrame({
+        "Chr": 1,
+        "Start": np.arange(n_people) * 100_000,
+        "End": np.arange(n_people) * 100_000 + 5_000_000,
+        "Comparison": [f"Pessoa {i:02d}" for i in range(n_people)],
+    }))
+    assert errors.empty
+    app = testing.AppTest.from_file(str(APP_PATH), default_timeout=30)
+    app.session_state["segments"] = segments
+    app.run()
+    assert not app.exception
+    return app
+
+
+def test_region_browser_paginates_people():
+    n_people = REGION_PAGE_SIZE * 2 + 5
+    app = app_with_segments(n_people)
+    page = next(widget for widget in app.number_input if widget.key == "region_page_1")
+    assert page.max == 3
+    assert any(f"{n_people} pessoa(s)" in caption.value for caption in app.caption)
+    page.set_value(3)
+    app.run()
+    assert not app.exception
+
+
+def test_region_browser_single_page():
+    app = app_with_segments(REGION_PAGE_SIZE)
+    assert not any(widget.key == "region_page_1" for widget in app.number_input)
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from dna_triangulation import EXCEL_AVAILABLE, save_project
+from dna_triangulation.cli import main
+
+from tests.helpers import TEST_CHROM_SIZES, random_segments
+
+OUTPUT_TABLES = ["stats", "genome", "triangulation"]
+
+
+# Função para gravar os segmentos como uma exportação de CSV/XLSX
+def write_export(segments, path):
+    table = segments[["Chr", "Start", "End", "Comparison"]].astype({"Chr": str})
+    if path.suffix == ".csv":
+        table.to_csv(path, index=False)
+    else:
+        table.to_excel(path, index=False)
+
+
+@pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl não instalado")
+def test_main_processes_every_file(tmp_path, capsys):
+    in_dir, out_dir = tmp_path / "entrada", tmp_path / "saida"
+    in_dir.mkdir()
+    segments = random_segments(200)
+    write_export(segments, in_dir / "kit_a.csv")
+    write_export(segments, in_dir / "kit_b.xlsx")
+    (in_dir / "projeto.dnatri").write_bytes(save_project(segments, TEST_CHROM_SIZES))
+    (in_dir / "notas.txt").write_text("ignorado")
+
+    assert main([str(in_dir), "-o", str(out_dir), "-j", "1"]) == 0
+    for stem in ["kit_a", "kit_b", "projeto"]:
+        assert (out_dir / f"{stem}_chart.png").read_bytes().startswith(b"\x89PNG")
+        for table in OUTPUT_TABLES:
+            assert (out_dir / f"{stem}_{table}.csv").exists()
+    assert pd.read_csv(out_dir / "kit_a_stats.csv").equals(pd.read_csv(out_dir / "kit_b_stats.csv"))
+    # O projeto usa os tamanhos de cromossomo gravados nele
+    project_stats = pd.read_csv(out_dir / "projeto_stats.csv", dtype={"Chr": str})
+    assert set(zip(project_stats["Chr"], project_stats["Chromosome_Size"])) <= {
+        (str(chrom), size) for chrom, size in TEST_CHROM_SIZES.items()
+    }
+    assert not any(out_dir.glob("notas*"))
+    assert "kit_a.csv: 200 segmentos" in capsys.readouterr().out
+
+
+def test_main_fails_on_bad_columns(tmp_path, capsys):
+    in_dir, out_dir = tmp_path / "entrada", tmp_path / "saida"
+    in_dir.mkdir()
+    write_export(random_segments(50), in_dir / "bom.csv")
+    (in_dir / "ruim.csv").write_text("Cromossomo,Inicio\n1,10\n")
+
+    assert main([str(in_dir), "-o", str(out_dir), "-j", "1"]) == 1
+    assert (out_dir / "bom_chart.png").exists()
+    assert not any(out_dir.glob("ruim_*"))
+    assert "ERRO ruim.csv" in capsys.readouterr().err
+
+
+def test_main_without_input_files(tmp_path):
+    assert main([str(tmp_path), "-o", str(tmp_path / "saida")]) == 1
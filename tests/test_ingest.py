@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dna_triangulation import CHROM_ORDER, POSITION_DTYPE, ingest_segments
+
+
+def raw(rows):
+    return pd.DataFrame(rows, columns=["Chr", "Start", "End", "Comparison"])
+
+
+def test_chromosome_labels_are_normalized():
+    segments, errors = ingest_segments(raw([
+        [1, 10, 20, "A"], ["2", 10, 20, "A"], [3.0, 10, 20, "A"], ["chr4", 10, 20, "A"],
+        ["CHR 5", 10, 20, "A"], ["x", 10, 20, "A"], ["Y", 10, 20, "A"], ["22.0", 10, 20, "A"],
+    ]))
+    assert errors.empty
+    assert list(segments["Chr"]) == [1, 2, 3, 4, 5, 'X', 'Y', 22]
+    assert list(segments["Chr"].cat.categories) == CHROM_ORDER
+
+
+def test_types_and_kit():
+    segments, _ = ingest_segments(raw([[1, 10, 20, " Ana "], [2, 30, 40, "Bia"]]), kit="Kit A")
+    assert segments["Start"].dtype == POSITION_DTYPE and segments["End"].dtype == POSITION_DTYPE
+    assert list(segments["Comparison"]) == ["Ana", "Bia"]
+    assert list(segments["Kit"]) == ["Kit A", "Kit A"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.234.567", 1234567), ("1,234,567", 1234567), ("1 234 567", 1234567),
+    ("1234567", 1234567), ("1234567.0", 1234567), ("123", 123),
+])
+def test_text_positions(text, expected):
+    segments, errors = ingest_segments(raw([[1, text, 300_000_000, "A"]]))
+    assert errors.empty
+    assert segments["Start"].iloc[0] == expected
+
+
+@pytest.mark.parametrize("text", ["1234567.5", "1234,5", "1.23.456", "abc", "", None, "-5"])
+def test_invalid_text_positions_are_rejected(text):
+    segments, errors = ingest_segments(raw([[1, text, 300_000_000, "A"]]))
+    assert segments.empty
+    assert errors["Erro"].iloc[0] == "Start inválido"
+
+
+def test_mixed_type_column():
+    segments, errors = ingest_segments(pd.DataFrame({
+        "Chr": [1, 1, 1],
+        "Start": pd.Series([1_000, "2.000", "1234567.5"], dtype=object),
+        "End": [5_000, 6_000, 9_000_000],
+        "Comparison": ["A", "B", "C"],
+    }))
+    assert list(segments["Start"]) == [1_000, 2_000]
+    assert list(errors["Linha"]) == [4]
+
+
+def test_error_report_rows_and_messages():
+    segments, errors = ingest_segments(raw([
+        [1, 10, 20, "A"],
+        ["Z", 10, 20, "B"],
+        [1, 30, 20, "C"],
+        [1, 10, 20, ""],
+        [1, 2**31, 2**31 + 10, "D"],
+        [1, 10, 2**31 - 1, "E"],
+    ]))
+    assert list(segments["Comparison"]) == ["A", "E"]
+    assert segments["End"].iloc[1] == np.iinfo(POSITION_DTYPE).max
+    # Linha 1 é o cabeçalho do arquivo
+    assert list(errors["Linha"]) == [3, 4, 5, 6]
+    assert list(errors["Erro"]) == [
+        "Cromossomo inválido",
+        "End deve ser maior que Start",
+        "Comparison vazio",
+        "Start inválido; End inválido",
+    ]
+
+
+def test_all_rows_rejected():
+    segments, errors = ingest_segments(raw([["Z", 10, 20, "A"], [1, 20, 10, "B"]]))
+    assert segments.empty
+    assert list(segments.columns) == ["Chr", "Start", "End", "Comparison", "Kit"]
+    assert len(errors) == 2
+
+
+def test_no_rows():
+    segments, errors = ingest_segments(raw([]))
+    assert segments.empty and errors.empty
@@ -0,0 +1,41 @@
+import numpy as np
+
+from dna_triangulation import SegmentIndex, shared_segment_matrix
+
+from tests.helpers import TEST_CHROM_SIZES, coverage_bitmaps, true_runs
+
+
+# Função de referência: sobreposição de cada par de pessoas, posição a posição
+def naive_matrix(segments, names, chroms):
+    bitmaps = coverage_bitmaps(segments)
+    shared_bp = np.zeros((len(names), len(names)), dtype=np.int64)
+    shared_count = np.zeros((len(names), len(names)), dtype=np.int64)
+    for chrom in chroms:
+        empty = np.zeros(TEST_CHROM_SIZES[chrom], dtype=bool)
+        for i, first in enumerate(names):
+            for j, second in enumerate(names):
+                both = bitmaps.get((chrom, first), empty) & bitmaps.get((chrom, second), empty)
+                shared_bp[i, j] += both.sum()
+                shared_count[i, j] += len(true_runs(both))
+    return shared_bp, shared_count
+
+
+def test_matrix_matches_pairwise_overlap(segments):
+    index = SegmentIndex(segments)
+    chroms = index.chromosomes()
+    names, shared_bp, shared_count = shared_segment_matrix(index, chroms, index.comparisons())
+    assert names == index.comparisons()
+    expected_bp, expected_count = naive_matrix(segments, names, chroms)
+    np.testing.assert_array_equal(shared_bp, expected_bp)
+    np.testing.assert_array_equal(shared_count, expected_count)
+    np.testing.assert_array_equal(shared_bp, shared_bp.T)
+
+
+def test_matrix_chunks_and_selection(segments):
+    index = SegmentIndex(segments)
+    people = index.comparisons()[1:5]
+    chroms = [2, 'X']
+    names, shared_bp, shared_count = shared_segment_matrix(index, chroms, people, chunk_rows=7)
+    expected_bp, expected_count = naive_matrix(segments, names, chroms)
+    np.testing.assert_array_equal(shared_bp, expected_bp)
+    np.testing.assert_array_equal(shared_count, expected_count)
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from dna_triangulation import Profiler, format_bytes, profiling
+
+
+# Relógio falso: avança 1 ms a cada leitura
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = iter(range(1000))
+    monkeypatch.setattr(profiling.time, "perf_counter", lambda: next(ticks) / 1000)
+
+
+def test_nested_spans_depth_and_order(clock):
+    profiler = Profiler()
+    with profiler.span("render"):
+        with profiler.span("build", chrom=1):
+            pass
+        with profiler.span("save"):
+            pass
+    with profiler.span("stats"):
+        pass
+
+    # Os spans internos terminam antes e são gravados antes do externo
+    assert [span["name"] for span in profiler.spans] == ["build", "save", "render", "stats"]
+    assert [(span["name"], span["depth"], span["start_ms"], span["duration_ms"])
+            for span in profiler.ordered_spans()] == [
+        ("render", 0, 1.0, 5.0),
+        ("build", 1, 2.0, 1.0),
+        ("save", 1, 4.0, 1.0),
+        ("stats", 0, 7.0, 1.0),
+    ]
+    assert profiler.spans[0]["chrom"] == 1
+
+
+def test_span_is_recorded_when_the_block_raises(clock):
+    profiler = Profiler()
+    with pytest.raises(RuntimeError):
+        with profiler.span("falha"):
+            raise RuntimeError
+    with profiler.span("depois"):
+        pass
+    assert [(span["name"], span["depth"]) for span in profiler.ordered_spans()] == [("falha", 0), ("depois", 0)]
+
+
+def test_summary_aggregates_by_name(clock):
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.span("stats"):
+            pass
+    with profiler.span("chart"):
+        with profiler.span("stats"):
+            pass
+
+    summary = profiler.summary()
+    assert list(summary.columns) == ["Span", "Calls", "Total_ms", "Max_ms"]
+    rows = {row.Span: (row.Calls, row.Total_ms, row.Max_ms) for row in summary.itertuples()}
+    assert rows == {"stats": (4, 4.0, 1.0), "chart": (1, 3.0, 3.0)}
+
+
+def test_summary_without_spans():
+    summary = Profiler().summary()
+    assert summary.empty
+    assert list(summary.columns) == ["Span", "Calls", "Total_ms", "Max_ms"]
+
+
+def test_to_json_payload(clock):
+    profiler = Profiler("rerun")
+    with profiler.span("import", file="a.csv"):
+        with profiler.span("ingest"):
+            pass
+
+    payload = json.loads(profiler.to_json(session_bytes=1024))
+    assert list(payload) == ["label", "created", "session_bytes", "spans"]
+    assert payload["label"] == "rerun"
+    assert payload["created"] == profiler.created.isoformat()
+    assert payload["session_bytes"] == 1024
+    assert payload["spans"] == [
+        {"name": "import", "start_ms": 1.0, "duration_ms": 3.0, "depth": 0, "file": "a.csv"},
+        {"name": "ingest", "start_ms": 2.0, "duration_ms": 1.0, "depth": 1},
+    ]
+
+
+@pytest.mark.parametrize("num, expected", [(512, "512 B"), (2048, "2.0 KB"), (5 * 1024 ** 2, "5.0 MB"),
+                                           (3 * 1024 ** 3, "3.0 GB")])
+def test_format_bytes(num, expected):
+    assert format_bytes(num) == expected
@@ -0,0 +1,86 @@
+import json
+import struct
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dna_triangulation import DEFAULT_KIT, POSITION_DTYPE, concat_segments, load_project, save_project
+from dna_triangulation.project import PROJECT_ALIGNMENT, PROJECT_MAGIC
+
+from tests.helpers import TEST_CHROM_SIZES, random_segments
+
+
+# Função para montar um projeto no layout das versões antigas (sem kits)
+def legacy_project(segments, version):
+    position_dtype = "<i8" if version == 1 else "<i4"
+    arrays = {
+        "chr": segments["Chr"].cat.codes.to_numpy().astype("|i1"),
+        "comparison": segments["Comparison"].cat.codes.to_numpy().astype("<i4"),
+        "start": segments["Start"].to_numpy().astype(position_dtype),
+        "end": segments["End"].to_numpy().astype(position_dtype),
+    }
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "offset": offset}
+        offset += -(-array.nbytes // PROJECT_ALIGNMENT) * PROJECT_ALIGNMENT
+    header = json.dumps({
+        "version": version,
+        "count": len(segments),
+        "comparisons": list(segments["Comparison"].cat.categories),
+        "chromosome_sizes": {str(chrom): size for chrom, size in TEST_CHROM_SIZES.items()},
+        "arrays": layout,
+    }).encode()
+    data_start = -(-(len(PROJECT_MAGIC) + 8 + len(header)) // PROJECT_ALIGNMENT) * PROJECT_ALIGNMENT
+    buffer = bytearray(data_start + offset)
+    buffer[:len(PROJECT_MAGIC) + 8] = PROJECT_MAGIC + struct.pack("<Q", len(header))
+    buffer[len(PROJECT_MAGIC) + 8:len(PROJECT_MAGIC) + 8 + len(header)] = header
+    for name, array in arrays.items():
+        position = data_start + layout[name]["offset"]
+        buffer[position:position + array.nbytes] = array.tobytes()
+    return bytes(buffer)
+
+
+# Função para comparar segmentos tipados, incluindo as categorias
+def assert_same_segments(loaded, expected):
+    assert list(loaded.columns) == list(expected.columns)
+    assert loaded["Start"].dtype == POSITION_DTYPE and loaded["End"].dtype == POSITION_DTYPE
+    pd.testing.assert_frame_equal(loaded.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("kits", [1, 2])
+def test_round_trip_from_bytes(segments, kits):
+    if kits == 2:
+        segments = concat_segments([segments, random_segments(100, seed=5, kit="Outro")])
+    loaded, chrom_sizes = load_project(BytesIO(save_project(segments, TEST_CHROM_SIZES)))
+    assert_same_segments(loaded, segments)
+    assert chrom_sizes == TEST_CHROM_SIZES
+
+
+def test_round_trip_from_path(segments, tmp_path):
+    path = tmp_path / "projeto.dnatri"
+    path.write_bytes(save_project(segments, TEST_CHROM_SIZES))
+    loaded, chrom_sizes = load_project(path)
+    assert_same_segments(loaded, segments)
+    assert chrom_sizes == TEST_CHROM_SIZES
+
+
+def test_round_trip_empty():
+    segments = random_segments(10).iloc[:0]
+    loaded, _ = load_project(save_project(segments, TEST_CHROM_SIZES))
+    assert loaded.empty
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_legacy_versions_load(segments, version):
+    loaded, chrom_sizes = load_project(legacy_project(segments, version))
+    assert_same_segments(loaded, segments.assign(
+        Kit=pd.Categorical.from_codes(np.zeros(len(segments), dtype=np.int8), categories=[DEFAULT_KIT])
+    ))
+    assert chrom_sizes == TEST_CHROM_SIZES
+
+
+def test_invalid_file_raises():
+    with pytest.raises(ValueError):
+        load_project(b"nao e um projeto" * 8)
@@ -0,0 +1,135 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from dna_triangulation import EXCEL_AVAILABLE, match_columns, read_kits, read_segment_chunks, read_segments
+
+
+def csv_file(text):
+    return BytesIO(text.encode("utf-8"))
+
+
+def xlsx_file(rows):
+    output = BytesIO()
+    pd.DataFrame(rows[1:], columns=rows[0]).to_excel(output, index=False)
+    output.seek(0)
+    return output
+
+
+@pytest.mark.parametrize("columns", [
+    ["Chr", "Start", "End", "Comparison"],
+    ["Chromosome", "Start Location", "End Location", "Match Name"],
+    ["chromosome_number", "b37_start", "b37_end", "display name"],
+    ["CHROM", "Start Point", "End Point", "Name", "Centimorgans"],
+])
+def test_match_columns_aliases(columns):
+    mapping = match_columns(columns)
+    assert sorted(mapping.values()) == ["Chr", "Comparison", "End", "Start"]
+
+
+def test_match_columns_missing_column():
+    with pytest.raises(ValueError):
+        match_columns(["Chromosome", "Start Location", "Match Name"])
+
+
+@pytest.mark.parametrize("sep", [",", ";", "\t"])
+def test_csv_delimiter_detection(sep):
+    text = sep.join(["Match Name", "Chromosome", "Start Location", "End Location", "cM"]) + "\n"
+    text += sep.join(["Ana", "1", "100", "200", "5.5"]) + "\n"
+    text += sep.join(["Bia", "X", "300", "400", "7"]) + "\n"
+    segments, errors = read_segments(csv_file(text), "matches.csv")
+    assert errors.empty
+    assert list(segments["Comparison"]) == ["Ana", "Bia"]
+    assert list(segments["Chr"]) == [1, 'X']
+    assert list(segments["End"]) == [200, 400]
+
+
+def test_csv_with_bom_and_thousands_separators():
+    text = "﻿Chr;Start;End;Comparison\n1;1.000.000;2.500.000;Ana\n"
+    segments, errors = read_segments(csv_file(text), "matches.csv")
+    assert errors.empty
+    assert list(segments["Start"]) == [1_000_000]
+
+
+def test_chunked_csv_matches_single_read_and_keeps_row_numbers():
+    lines = ["Chr,Start,End,Comparison"]
+    lines += [f"{i % 22 + 1},{i * 10},{i * 10 + 5},P{i % 4}" for i in range(25)]
+    lines[8] = "1,50,10,P0"     # linha 9 do arquivo: End menor que Start
+    lines[21] = "Z,1,2,P1"      # linha 22 do arquivo: cromossomo inválido
+    text = "\n".join(lines) + "\n"
+
+    progress = []
+    chunked, chunked_errors = read_segments(csv_file(text), "a.csv", chunksize=4,
+                                            on_progress=lambda fraction, rows: progress.append((fraction, rows)))
+    whole, whole_errors = read_segments(csv_file(text), "a.csv")
+
+    pd.testing.assert_frame_equal(chunked, whole)
+    pd.testing.assert_frame_equal(chunked_errors, whole_errors)
+    assert list(chunked_errors["Linha"]) == [9, 22]
+    assert len(chunked) == 23
+    assert len(progress) == 7
+    assert [rows for _, rows in progress][-1] == 23
+    assert all(a <= b for (a, _), (b, _) in zip(progress, progress[1:]))
+
+
+def test_csv_header_only():
+    segments, errors = read_segments(csv_file("Chr,Start,End,Comparison\n"), "vazio.csv")
+    assert segments.empty and errors.empty
+
+
+def test_csv_all_rows_rejected():
+    segments, errors = read_segments(csv_file("Chr,Start,End,Comparison\nZ,1,2,A\n1,5,2,B\n"), "a.csv")
+    assert segments.empty
+    assert list(errors["Linha"]) == [2, 3]
+
+
+def test_csv_missing_columns():
+    with pytest.raises(ValueError):
+        read_segments(csv_file("Chr,Start,Comparison\n1,2,A\n"), "a.csv")
+
+
+@pytest.mark.parametrize("file_name", ["MATCHES.CSV", "Matches.Csv", "kit.v2.csv"])
+def test_extension_is_case_insensitive(file_name):
+    segments, errors = read_segments(csv_file("Chr,Start,End,Comparison\n1,10,20,Ana\n"), file_name)
+    assert errors.empty and len(segments) == 1
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        read_segments(csv_file("Chr,Start,End,Comparison\n"), "a.txt")
+
+
+@pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl não instalado")
+def test_chunked_xlsx():
+    rows = [["Match Name", "Chromosome", "Start Location", "End Location"]]
+    rows += [[f"P{i % 3}", i % 22 + 1, i * 10, i * 10 + 5] for i in range(10)]
+    rows[4][1] = "Z"
+    chunks = list(read_segment_chunks(xlsx_file(rows), "a.xlsx", chunksize=3))
+    assert [len(chunk) for chunk, _ in chunks] == [3, 3, 3, 1]
+    assert chunks[-1][1] == 1.0
+
+    segments, errors = read_segments(xlsx_file(rows), "a.xlsx", chunksize=3, kit="Planilha")
+    assert len(segments) == 9
+    assert list(errors["Linha"]) == [5]
+    assert set(segments["Kit"]) == {"Planilha"}
+
+
+@pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl não instalado")
+def test_xlsx_header_only():
+    segments, errors = read_segments(xlsx_file([["Chr", "Start", "End", "Comparison"]]), "vazio.xlsx")
+    assert segments.empty and errors.empty
+
+
+def test_read_kits_reports_progress_and_failures():
+    sources = [
+        (csv_file("Chr,Start,End,Comparison\n1,1,2,A\n2,3,4,B\n"), "a.csv", "Kit A"),
+        (csv_file("Chr,Inicio\n1,2\n"), "b.csv", "Kit B"),
+    ]
+    progress = []
+    results = {kit: future for kit, future in read_kits(sources, on_progress=progress.append)}
+    segments, errors = results["Kit A"].result()
+    assert len(segments) == 2 and errors.empty
+    assert set(segments["Kit"]) == {"Kit A"}
+    assert isinstance(results["Kit B"].exception(), ValueError)
+    assert progress[-1] == 1.0
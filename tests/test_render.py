@@ -0,0 +1,172 @@
+import re
+import warnings
+
+import pytest
+
+from dna_triangulation import render
+from dna_triangulation import (
+    RenderCache,
+    SegmentIndex,
+    build_chromosome_figure,
+    build_color_map,
+    chart_cache_key,
+    export_chart,
+)
+
+from tests.helpers import TEST_CHROM_SIZES, random_segments
+
+
+# Função para calcular a chave do gráfico como o app faz a cada rerun
+def chart_key(index):
+    people = index.comparisons()
+    return chart_cache_key(index, index.people_by_chromosome(index.chromosomes(), people),
+                           build_color_map(people), TEST_CHROM_SIZES)
+
+
+# Função para exportar o gráfico de todos os cromossomos do índice
+def export(index, fmt):
+    people = index.comparisons()
+    return export_chart(index, index.people_by_chromosome(index.chromosomes(), people),
+                        build_color_map(people), TEST_CHROM_SIZES, fmt, dpi=50)
+
+
+# Função para contar os retângulos desenhados em cada linha (pessoa) do gráfico
+def rectangles_per_row(fig):
+    rows = {}
+    for collection in fig.axes[0].collections:
+        for path in collection.get_paths():
+            row = round(float(path.vertices[:, 1].min()), 6)
+            rows[row] = rows.get(row, 0) + 1
+    return rows
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.put("c", b"12")
+    assert cache.get("a") == b"1234"  # "a" passa a ser o mais recente
+    cache.put("d", b"1234")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [b"1234", b"12", b"1234"]
+    assert len(cache) == 3 and cache.nbytes == 10
+
+
+def test_render_cache_replacing_key_updates_size():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("a", b"12")
+    assert len(cache) == 1 and cache.nbytes == 2
+
+
+def test_render_cache_keeps_single_oversized_entry():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("big", b"x" * 50)
+    assert cache.get("a") is None
+    assert cache.get("big") == b"x" * 50
+    assert len(cache) == 1 and cache.nbytes == 50
+
+
+def test_render_cache_renders_once():
+    cache = RenderCache()
+    calls = []
+    render = lambda: calls.append(1) or b"png"
+    assert cache.get_or_render("key", render) == b"png"
+    assert cache.get_or_render("key", render) == b"png"
+    assert len(calls) == 1
+
+
+def test_chart_cache_key_is_stable_with_many_people():
+    segments = random_segments(600, n_people=60)
+    index = SegmentIndex(segments)
+    assert len(index.comparisons()) > 40  # Acima da paleta fixa de 40 cores
+    assert chart_key(index) == chart_key(SegmentIndex(segments))
+
+
+def test_chart_cache_key_changes_after_add():
+    segments = random_segments(600, n_people=60)
+    index = SegmentIndex(segments)
+    before = chart_key(index)
+    index.add(random_segments(1, n_people=1, seed=5))
+    assert chart_key(index) != before
+
+
+@pytest.mark.parametrize("fmt, magic", [("png", b"\x89PNG"), ("svg", b"<?xml"), ("pdf", b"%PDF"),
+                                        ("pdf-pages", b"%PDF")])
+def test_export_chart_formats(segments, fmt, magic):
+    data = export(SegmentIndex(segments), fmt)
+    assert data.startswith(magic)
+    if fmt == "svg":
+        assert b"<svg" in data
+
+
+def test_export_chart_pdf_pages_has_one_page_per_chromosome(segments):
+    index = SegmentIndex(segments)
+    data = export(index, "pdf-pages")
+    assert len(re.findall(rb"/Type\s*/Page\b", data)) == len(index.chromosomes())
+    assert len(re.findall(rb"/Type\s*/Page\b", export(index, "pdf"))) == 1
+
+
+def test_export_chart_rejects_unknown_format(segments, monkeypatch):
+    # O formato é validado antes de montar a figura
+    monkeypatch.setattr(render, "build_chromosome_figure", None)
+    with pytest.raises(ValueError, match="tiff"):
+        export(SegmentIndex(segments), "tiff")
+
+
+@pytest.mark.parametrize("pixel_width", [30, 120])
+def test_level_of_detail_limits_rectangles_per_row(pixel_width):
+    index = SegmentIndex(random_segments(3000, n_people=3))
+    people = index.comparisons()
+    chrom_people = index.people_by_chromosome(index.chromosomes(), people)
+    color_map = build_color_map(people)
+
+    full = build_chromosome_figure(index, chrom_people, color_map, TEST_CHROM_SIZES)
+    assert max(rectangles_per_row(full).values()) > pixel_width
+    reduced = build_chromosome_figure(index, chrom_people, color_map, TEST_CHROM_SIZES, pixel_width=pixel_width)
+    counts = rectangles_per_row(reduced)
+    assert len(counts) == len(rectangles_per_row(full))
+    assert max(counts.values()) <= pixel_width
+
+
+# Função para ler os retângulos de cobertura e os nomes de um gráfico de região
+def region_contents(fig):
+    ax = fig.axes[0]
+    blocks = [(path.vertices[:, 0].min(), path.vertices[:, 0].max())
+              for collection in ax.collections[:1] for path in collection.get_paths()]
+    return blocks, [text.get_text() for text in ax.texts]
+
+
+def test_region_figure_clips_to_window(segments):
+    index = SegmentIndex(segments)
+    people = index.comparisons()
+    start, end = 100, 240
+    fig, n_segments = render.build_region_figure(index, 1, start, end, people, build_color_map(people))
+    window = index.overlapping(1, start, end, people)
+    assert n_segments == sum(len(starts) for starts, _ in window.values())
+    blocks, names = region_contents(fig)
+    assert names == [person for person in people if person in window]
+    assert all(start <= block_start < block_end <= end for block_start, block_end in blocks)
+    assert fig.axes[0].get_xlim() == (start, end)
+
+
+def test_region_figure_leaves_out_people_without_segments(segments):
+    index = SegmentIndex(segments)
+    people = index.comparisons()
+    window = index.overlapping(2, 0, 40, people)
+    assert 0 < len(window) < len(people)
+    fig, _ = render.build_region_figure(index, 2, 0, 40, people, build_color_map(people))
+    assert region_contents(fig)[1] == [person for person in people if person in window]
+
+
+@pytest.mark.parametrize("start, end", [(50, 50), (590, 600)])
+def test_region_figure_without_segments(start, end):
+    index = SegmentIndex(random_segments(20, seed=4))
+    people = index.comparisons()
+    assert not index.overlapping(1, start, end)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        fig, n_segments = render.build_region_figure(index, 1, start, end, people, build_color_map(people))
+    assert n_segments == 0
+    assert region_contents(fig) == ([], ["Nenhum segmento nesta região"])
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from dna_triangulation import POSITION_DTYPE, SegmentIndex, concat_segments, empty_segments
+
+from tests.helpers import random_segments
+
+
+# Função para comparar o conteúdo de dois índices, grupo a grupo
+def assert_same_index(index, expected):
+    assert index.chromosomes() == expected.chromosomes()
+    assert index.comparisons() == expected.comparisons()
+    for chrom in expected.chromosomes():
+        assert index.comparisons(chrom) == expected.comparisons(chrom)
+        for comparison in expected.comparisons(chrom):
+            starts, ends = index.segments(chrom, comparison)
+            expected_starts, expected_ends = expected.segments(chrom, comparison)
+            # Segmentos com o mesmo Start podem vir em outra ordem
+            assert sorted(zip(starts, ends)) == sorted(zip(expected_starts, expected_ends))
+            assert np.all(np.diff(starts) >= 0)
+            for gap in (0, 10):
+                np.testing.assert_array_equal(index.merged(chrom, comparison, gap),
+                                              expected.merged(chrom, comparison, gap))
+
+
+def test_add_matches_rebuild(segments):
+    base, extra = segments.iloc[:250], segments.iloc[250:]
+    index = SegmentIndex(base)
+    index.add(extra)
+    assert len(index) == len(segments)
+    assert_same_index(index, SegmentIndex(segments))
+
+
+def test_add_new_people_matches_rebuild(segments):
+    extra = random_segments(50, n_people=3, seed=1)
+    extra["Comparison"] = extra["Comparison"].cat.rename_categories(lambda name: f"Nova {name}")
+    index = SegmentIndex(segments)
+    index.add(extra)
+    assert_same_index(index, SegmentIndex(concat_segments([segments, extra])))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_remove_matches_rebuild(segments, seed):
+    rows = np.random.default_rng(seed).choice(len(segments), size=120, replace=False)
+    index = SegmentIndex(segments)
+    index.remove(segments.iloc[rows])
+    assert_same_index(index, SegmentIndex(segments.drop(index=segments.index[rows])))
+
+
+def test_remove_drops_empty_groups(segments):
+    person = segments["Comparison"].iloc[0]
+    index = SegmentIndex(segments)
+    index.remove(segments[segments["Comparison"] == person])
+    assert person not in index.comparisons()
+    assert_same_index(index, SegmentIndex(segments[segments["Comparison"] != person]))
+
+
+def test_group_arrays_keep_position_dtype(segments):
+    index = SegmentIndex(segments.iloc[:250])
+    index.add(segments.iloc[250:])
+    for built in (SegmentIndex(segments), index):
+        for arrays in built._groups.values():
+            assert [array.dtype for array in arrays] == [POSITION_DTYPE] * 3
+
+
+def test_remove_duplicate_removes_one_occurrence(segments):
+    duplicated = concat_segments([segments, segments.iloc[:1]])
+    index = SegmentIndex(duplicated)
+    index.remove(segments.iloc[:1])
+    assert_same_index(index, SegmentIndex(segments))
+
+
+def test_edit_invalidates_aggregates(segments):
+    index = SegmentIndex(segments)
+    chrom, person = segments["Chr"].iloc[0], segments["Comparison"].iloc[0]
+    index.aggregates(chrom, person)["coverage"] = "antigo"
+    index.add(segments.iloc[:1])
+    assert "coverage" not in index.aggregates(chrom, person)
+
+
+# Função de referência: união simples de intervalos ordenados, unindo lacunas de até `gap`
+def naive_merge(starts, ends, gap):
+    merged = []
+    for start, end in sorted(zip(starts, ends)):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(block) for block in merged]
+
+
+@pytest.mark.parametrize("gap", [0, 1, 7, 0.5, 12.75])
+def test_merged_matches_naive_merge(segments, gap):
+    index = SegmentIndex(segments)
+    for chrom in index.chromosomes():
+        for person in index.comparisons(chrom):
+            merged_starts, merged_ends = index.merged(chrom, person, gap)
+            assert list(zip(merged_starts, merged_ends)) == naive_merge(*index.segments(chrom, person), gap)
+
+
+def test_overlapping_matches_scan(segments):
+    index = SegmentIndex(segments)
+    for chrom in index.chromosomes():
+        for start, end in [(0, 50), (100, 240), (295, 300)]:
+            window = index.overlapping(chrom, start, end)
+            for person in index.comparisons(chrom):
+                starts, ends = index.segments(chrom, person)
+                keep = (starts < end) & (ends > start)
+                if keep.any():
+                    assert sorted(zip(*window[person])) == sorted(zip(starts[keep], ends[keep]))
+                else:
+                    assert person not in window
+
+
+def test_overlapping_empty_window(segments):
+    index = SegmentIndex(segments)
+    starts, ends = index.segments(1, index.comparisons(1)[0])
+    inside = int(starts[0]) + 1 if ends[0] - starts[0] > 1 else int(starts[0])
+    assert index.overlapping(1, inside, inside) == {}
+    assert index.overlapping(1, 300, 100) == {}
+
+
+def test_add_and_remove_with_two_kits(segments):
+    other_kit = random_segments(200, seed=3, kit="Outro")
+    combined = concat_segments([segments, other_kit])
+    index = SegmentIndex(combined.iloc[:450])
+    index.add(combined.iloc[450:])
+    assert_same_index(index, SegmentIndex(combined))
+    assert index.kits() == ["Outro", "Principal"]
+    index.remove(combined.iloc[:100])
+    assert_same_index(index, SegmentIndex(combined.iloc[100:]))
+
+
+def test_add_and_remove_empty_frame(segments):
+    index = SegmentIndex(segments)
+    index.add(empty_segments())
+    index.remove(empty_segments())
+    assert_same_index(index, SegmentIndex(segments))
+
+    empty_index = SegmentIndex(empty_segments())
+    empty_index.add(empty_segments())
+    assert len(empty_index) == 0
@@ -0,0 +1,80 @@
+import numpy as np
+
+from dna_triangulation import KIT_SEPARATOR, SegmentIndex, concat_segments, coverage_stats, genome_coverage, kit_coverage
+
+from tests.helpers import TEST_CHROM_SIZES, coverage_bitmaps, random_segments, true_runs
+
+
+def test_coverage_stats_match_naive_union(segments):
+    index = SegmentIndex(segments)
+    chroms = index.chromosomes()
+    stats = coverage_stats(index, chroms, index.comparisons(), TEST_CHROM_SIZES)
+    bitmaps = coverage_bitmaps(segments)
+    assert len(stats) == len(bitmaps)
+
+    for row in stats.itertuples():
+        group = segments[(segments["Chr"] == row.Chr) & (segments["Comparison"] == row.Comparison)]
+        bitmap = bitmaps[(row.Chr, row.Comparison)]
+        blocks = true_runs(bitmap)
+        gaps = [start - end for (_, end), (start, _) in zip(blocks[:-1], blocks[1:])]
+        assert row.Total_Segments == len(group)
+        assert row.Total_Size == (group["End"] - group["Start"]).sum()
+        assert row.Covered_Size == bitmap.sum()
+        assert row.Largest_Segment == max(end - start for start, end in blocks)
+        assert row.Gap_Count == len(gaps)
+        assert row.Gap_Size == sum(gaps)
+        assert row.Largest_Gap == max(gaps, default=0)
+        assert row.Coverage_Percentage <= 100
+
+
+def test_coverage_stats_after_edit_match_rebuild(segments):
+    index = SegmentIndex(segments.iloc[:300])
+    coverage_stats(index, index.chromosomes(), index.comparisons(), TEST_CHROM_SIZES)
+    index.add(segments.iloc[300:])
+    index.remove(segments.iloc[:40])
+
+    rebuilt = SegmentIndex(segments.iloc[40:])
+    cached = coverage_stats(index, rebuilt.chromosomes(), rebuilt.comparisons(), TEST_CHROM_SIZES)
+    fresh = coverage_stats(rebuilt, rebuilt.chromosomes(), rebuilt.comparisons(), TEST_CHROM_SIZES)
+    assert cached.equals(fresh)
+
+
+def test_genome_union_matches_naive_union(segments):
+    index = SegmentIndex(segments)
+    chroms = index.chromosomes()
+    people = index.comparisons()
+    stats = coverage_stats(index, chroms, people, TEST_CHROM_SIZES)
+    totals = genome_coverage(index, chroms, people, TEST_CHROM_SIZES, stats)
+
+    union = {chrom: np.zeros(size, dtype=bool) for chrom, size in TEST_CHROM_SIZES.items()}
+    for (chrom, _), bitmap in coverage_bitmaps(segments).items():
+        union[chrom] |= bitmap
+    union_row = totals.iloc[-1]
+    assert union_row["Covered_Size"] == sum(bitmap.sum() for bitmap in union.values())
+    assert union_row["Total_Segments"] == len(segments)
+
+
+def test_kit_coverage_with_the_same_people_in_two_kits(segments):
+    other_kit = random_segments(300, seed=3, kit="Outro")
+    index = SegmentIndex(concat_segments([segments, other_kit]))
+    names = sorted(set(segments["Comparison"]) & set(other_kit["Comparison"]))
+    assert names and index.qualified
+
+    # A mesma pessoa nos dois kits tem rótulos distintos
+    for name in names:
+        labels = [f"Outro{KIT_SEPARATOR}{name}", f"Principal{KIT_SEPARATOR}{name}"]
+        assert set(labels) <= set(index.comparisons())
+        assert [index.kit_of(label) for label in labels] == ["Outro", "Principal"]
+    assert len(index.comparisons()) == (segments["Comparison"].nunique() + other_kit["Comparison"].nunique())
+
+    chroms = [1, 'X']
+    totals = kit_coverage(index, chroms, index.comparisons(), TEST_CHROM_SIZES).set_index("Kit")
+    assert list(totals.index) == ["Outro", "Principal"]
+    for kit, kit_segments in [("Principal", segments), ("Outro", other_kit)]:
+        assert totals.loc[kit, "People"] == kit_segments["Comparison"].nunique()
+        kit_segments = kit_segments[kit_segments["Chr"].isin(chroms)]
+        union = {chrom: np.zeros(TEST_CHROM_SIZES[chrom], dtype=bool) for chrom in chroms}
+        for (chrom, _), bitmap in coverage_bitmaps(kit_segments).items():
+            union[chrom] |= bitmap
+        assert totals.loc[kit, "Total_Segments"] == len(kit_segments)
+        assert totals.loc[kit, "Covered_Size"] == sum(bitmap.sum() for bitmap in union.values())
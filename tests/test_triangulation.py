@@ -0,0 +1,48 @@
+import pytest
+
+from dna_triangulation import SegmentIndex, triangulate
+
+from tests.helpers import TEST_CHROM_SIZES, coverage_bitmaps
+
+
+# Função de referência: o conjunto de pessoas de cada posição, agrupado em trechos iguais
+def naive_regions(segments, people, min_comparisons, min_length):
+    bitmaps = coverage_bitmaps(segments)
+    regions = []
+    for chrom, size in TEST_CHROM_SIZES.items():
+        members = [
+            tuple(person for person in people if (chrom, person) in bitmaps and bitmaps[(chrom, person)][position])
+            for position in range(size)
+        ]
+        start = 0
+        for position in range(1, size + 1):
+            if position == size or members[position] != members[start]:
+                if len(members[start]) >= min_comparisons and position - start >= min_length:
+                    regions.append((chrom, start, position, len(members[start]), "; ".join(members[start])))
+                start = position
+    return regions
+
+
+@pytest.mark.parametrize("min_comparisons, min_length", [(2, 0), (3, 0), (2, 15)])
+def test_triangulate_matches_naive_sweep(segments, min_comparisons, min_length):
+    index = SegmentIndex(segments)
+    people = index.comparisons()
+    regions = triangulate(index, index.chromosomes(), people, min_comparisons, min_length)
+    found = [
+        (row.Chr, row.Start, row.End, row.Num_Comparisons, row.Comparisons)
+        for row in regions.itertuples()
+    ]
+    assert found == naive_regions(segments, people, min_comparisons, min_length)
+    assert (regions["Length"] == regions["End"] - regions["Start"]).all()
+
+
+def test_triangulate_respects_selection(segments):
+    index = SegmentIndex(segments)
+    people = index.comparisons()[:3]
+    chroms = [1, 'X']
+    regions = triangulate(index, chroms, people)
+    expected = [
+        region for region in naive_regions(segments[segments["Comparison"].isin(people)], people, 2, 0)
+        if region[0] in chroms
+    ]
+    assert [(r.Chr, r.Start, r.End, r.Num_Comparisons, r.Comparisons) for r in regions.itertuples()] == expected